@@ -4,7 +4,7 @@ Basic Cache Module
 Implements a basic caching system without size limits
 """
 
-from base_caching import BaseCaching
+from base_caching import BaseCaching, print_discard
 
 
 class BasicCache(BaseCaching):
@@ -13,39 +13,37 @@ class BasicCache(BaseCaching):
     without any eviction policy (no size limits)
     """
 
-    def __init__(self):
-        """Initialize the basic cache"""
-        super().__init__()
-
-    def put(self, key, item):
+    def __init__(self, max_items=None, max_weight=None, **kwargs):
         """
-        Add an item to the cache
+        Initialize the basic cache
 
         Args:
-            key: Key to identify the item
-            item: Value to be stored in cache
-        """
-        if key is not None and item is not None:
-            self.cache_data[key] = item
+            max_items: Accepted for a uniform constructor, never enforced
+            max_weight: Must be None, there is no victim to evict for it
+            kwargs: Options forwarded to BaseCaching, such as compact
 
-    def get(self, key):
+        Raises:
+            ValueError: if a max_weight is given
         """
-        Retrieve an item from the cache by key
+        if max_weight is not None:
+            raise ValueError("BasicCache never evicts, it cannot enforce "
+                             "a max_weight")
+        super().__init__(max_items, **kwargs)
 
-        Args:
-            key: Key to identify the item
+    def _pick_victim(self):
+        """
+        Never choose a key to discard, the basic cache has no limit
 
         Returns:
-            The value associated with the key, or None if not found
+            None
         """
-        if key is None or key not in self.cache_data:
-            return None
-        return self.cache_data.get(key)
+        return None
 
 
 if __name__ == "__main__":
     """Test the BasicCache"""
     my_cache = BasicCache()
+    my_cache.add_listener(print_discard)
     my_cache.print_cache()
     my_cache.put("A", "Hello")
     my_cache.put("B", "World")
@@ -4,7 +4,7 @@ FIFO Cache Module
 Implements a First-In-First-Out caching system
 """
 
-from base_caching import BaseCaching
+from base_caching import BaseCaching, print_discard
 
 
 class FIFOCache(BaseCaching):
@@ -12,50 +12,51 @@ class FIFOCache(BaseCaching):
     FIFOCache class that implements a First-In-First-Out caching system
     Discards the oldest item when the cache is full
     """
+    SNAPSHOT_ATTRS = ("keys_queue",)
 
-    def __init__(self):
-        """Initialize the FIFO cache"""
-        super().__init__()
-        self.keys_queue = []  # To maintain insertion order
-
-    def put(self, key, item):
+    def __init__(self, max_items=None, **kwargs):
         """
-        Add an item to the cache using FIFO algorithm
+        Initialize the FIFO cache
 
         Args:
-            key: Key to identify the item
-            item: Value to be stored in cache
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.keys_queue = self._recency_list()  # To maintain insertion order
+
+    def _on_insert(self, key):
         """
-        if key is not None and item is not None:
-            # If key already exists, update it but don't change queue position
-            if key not in self.cache_data:
-                self.keys_queue.append(key)
-            self.cache_data[key] = item
+        Queue a new key, updates keep their original position
 
-            # If cache exceeds max size, remove first item (FIFO)
-            if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-                first_key = self.keys_queue.pop(0)
-                del self.cache_data[first_key]
-                print(f"DISCARD: {first_key}")
+        Args:
+            key: Key that was added
+        """
+        self.keys_queue.push(key)
 
-    def get(self, key):
+    def _on_remove(self, key):
         """
-        Retrieve an item from the cache by key
+        Drop a key from the queue
 
         Args:
-            key: Key to identify the item
+            key: Key that left the cache
+        """
+        self.keys_queue.discard(key)
+
+    def _pick_victim(self):
+        """
+        Choose the first key that was inserted
 
         Returns:
-            The value associated with the key, or None if not found
+            The oldest key in the queue
         """
-        if key is None or key not in self.cache_data:
-            return None
-        return self.cache_data.get(key)
+        return self.keys_queue.oldest()
 
 
 if __name__ == "__main__":
     """Test the FIFOCache"""
     my_cache = FIFOCache()
+    my_cache.add_listener(print_discard)
     my_cache.put("A", "Hello")
     my_cache.put("B", "World")
     my_cache.put("C", "Holberton")
@@ -5,22 +5,45 @@ Implements a Least Frequently Used caching system
 Uses LFU algorithm with LRU as tie-breaker for items with same frequency
 """
 
-from base_caching import BaseCaching
-from collections import defaultdict, OrderedDict
+from base_caching import BaseCaching, print_discard
+from collections import OrderedDict
+from recency_list import ArrayRecencyList
 
 
 class LFUCache(BaseCaching):
     """
     LFUCache class that implements a Least Frequently Used caching system
     Discards the least frequently used item, with LRU as tie-breaker
+
+    Every aging_interval uses all frequencies are halved, so keys that
+    were hot long ago lose their lead and the cache follows the
+    workload, while empty frequency buckets are dropped as soon as they
+    empty to keep the metadata proportional to the cached keys
     """
+    SNAPSHOT_ATTRS = ("frequency", "frequency_map", "min_frequency",
+                      "_uses")
+
+    def __init__(self, max_items=None, aging_interval=None, **kwargs):
+        """
+        Initialize the LFU cache
 
-    def __init__(self):
-        """Initialize the LFU cache"""
-        super().__init__()
-        self.frequency = defaultdict(int)  # Track frequency of each key
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            aging_interval: Number of uses between two halvings of the
+                frequencies, defaults to 16 times the capacity (at least
+                128), 0 disables aging
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        if aging_interval is None:
+            aging_interval = max(128, 16 * (self.max_items or 0))
+        self.aging_interval = aging_interval
+        self.frequency = {}  # Track frequency of each key
         self.min_frequency = 0  # Track the minimum frequency
-        self.frequency_map = defaultdict(OrderedDict)  # Map frequency to keys in LRU order
+        # Map frequency to keys in LRU order, only non-empty buckets
+        self.frequency_map = {}
+        self._bucket = ArrayRecencyList if self.compact else OrderedDict
+        self._uses = 0  # Uses recorded since the last aging
 
     def _update_frequency(self, key):
         """
@@ -29,76 +52,116 @@ class LFUCache(BaseCaching):
         Args:
             key: Key to update frequency for
         """
-        if key in self.frequency:
-            old_freq = self.frequency[key]
+        old_freq = self.frequency.get(key)
+        if old_freq is not None:
             new_freq = old_freq + 1
-            
-            # Remove from old frequency bucket
-            if key in self.frequency_map[old_freq]:
-                del self.frequency_map[old_freq][key]
-                # If old frequency bucket is empty and it was the min, update min frequency
-                if not self.frequency_map[old_freq] and old_freq == self.min_frequency:
-                    self.min_frequency += 1
-
-            # Add to new frequency bucket (at the end for LRU order)
-            self.frequency_map[new_freq][key] = None
-            self.frequency[key] = new_freq
+
+            # Remove from old frequency bucket, dropping it once empty
+            bucket = self.frequency_map[old_freq]
+            del bucket[key]
+            if not bucket:
+                del self.frequency_map[old_freq]
+                if old_freq == self.min_frequency:
+                    self.min_frequency = new_freq
         else:
             # New key, set frequency to 1
-            self.frequency[key] = 1
-            self.frequency_map[1][key] = None
+            new_freq = 1
             self.min_frequency = 1
 
-    def put(self, key, item):
+        # Add to new frequency bucket (at the end for LRU order)
+        bucket = self.frequency_map.get(new_freq)
+        if bucket is None:
+            bucket = self.frequency_map[new_freq] = self._bucket()
+        bucket[key] = None
+        self.frequency[key] = new_freq
+
+        self._uses += 1
+        if self.aging_interval and self._uses >= self.aging_interval:
+            self._age()
+
+    def _age(self):
+        """
+        Halve every frequency, keeping at least 1 for cached keys
+
+        Buckets are merged from the lowest frequency up, so within a
+        merged bucket keys that were less used come first and are
+        evicted first, the LRU order of each source bucket being kept
+        """
+        aged_map = {}
+        for freq in sorted(self.frequency_map):
+            aged_freq = max(1, freq >> 1)
+            bucket = aged_map.get(aged_freq)
+            if bucket is None:
+                bucket = aged_map[aged_freq] = self._bucket()
+            for key in self.frequency_map[freq]:
+                bucket[key] = None
+                self.frequency[key] = aged_freq
+        self.frequency_map = aged_map
+        self.min_frequency = min(aged_map) if aged_map else 0
+        self._uses = 0
+
+    def _on_insert(self, key):
         """
-        Add an item to the cache using LFU algorithm
+        Start tracking a new key with a frequency of 1
 
         Args:
-            key: Key to identify the item
-            item: Value to be stored in cache
+            key: Key that was added
         """
-        if key is not None and item is not None:
-            # If cache is full and key is new, evict LFU item (with LRU tie-breaker)
-            if (len(self.cache_data) >= BaseCaching.MAX_ITEMS and 
-                key not in self.cache_data):
-                # Find the least frequently used key(s)
-                lfu_keys = self.frequency_map[self.min_frequency]
+        self._update_frequency(key)
 
-                # Get the least recently used key from the LFU bucket (first key in OrderedDict)
-                lru_lfu_key = next(iter(lfu_keys))
+    def _on_update(self, key):
+        """
+        Count a value replacement as a use of the key
 
-                # Remove the evicted key from all data structures
-                del self.cache_data[lru_lfu_key]
-                del self.frequency_map[self.min_frequency][lru_lfu_key]
-                del self.frequency[lru_lfu_key]
+        Args:
+            key: Key whose value was replaced
+        """
+        self._update_frequency(key)
 
-                print(f"DISCARD: {lru_lfu_key}")
+    def _on_access(self, key):
+        """
+        Count a read as a use of the key
 
-            # Add/update the item
-            self.cache_data[key] = item
-            self._update_frequency(key)
+        Args:
+            key: Key that was read
+        """
+        self._update_frequency(key)
 
-    def get(self, key):
+    def _on_remove(self, key):
         """
-        Retrieve an item from the cache by key and update frequency
+        Remove a key from the frequency structures
 
         Args:
-            key: Key to identify the item
+            key: Key that left the cache
+        """
+        freq = self.frequency.pop(key)
+        bucket = self.frequency_map[freq]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_map[freq]
+
+    def _pick_victim(self):
+        """
+        Choose the least frequently used key, LRU among equal frequencies
 
         Returns:
-            The value associated with the key, or None if not found
+            The key to discard
         """
-        if key is None or key not in self.cache_data:
-            return None
+        lfu_keys = self.frequency_map.get(self.min_frequency)
+        if lfu_keys is None:
+            # The minimum bucket was emptied by a removal, find the
+            # lowest frequency that still has keys
+            self.min_frequency = min(self.frequency_map)
+            lfu_keys = self.frequency_map[self.min_frequency]
 
-        # Update frequency since key was accessed
-        self._update_frequency(key)
-        return self.cache_data.get(key)
+        # Least recently used key of the bucket is the first one
+        return next(iter(lfu_keys))
 
 
 if __name__ == "__main__":
     """Test the LFUCache"""
     my_cache = LFUCache()
+    my_cache.add_listener(print_discard)
     my_cache.put("A", "Hello")
     my_cache.put("B", "World")
     my_cache.put("C", "Holberton")
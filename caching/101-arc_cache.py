@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+ARC Cache Module
+Implements an Adaptive Replacement Cache
+"""
+
+from base_caching import BaseCaching, print_discard
+
+
+class ARCCache(BaseCaching):
+    """
+    ARCCache class that implements the Adaptive Replacement Cache
+
+    Cached keys live in T1 (seen once recently) or T2 (seen at least
+    twice). Keys evicted from them are remembered without their value in
+    the ghost lists B1 and B2. A hit in a ghost list tells which side
+    was evicted too early and moves the target size p of T1, so the
+    cache shifts between recency and frequency with the workload
+    """
+    SNAPSHOT_ATTRS = ("t1", "t2", "b1", "b2", "p")
+
+    def __init__(self, max_items=None, **kwargs):
+        """
+        Initialize the ARC cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.t1 = self._recency_list()  # Recent keys, seen once
+        self.t2 = self._recency_list()  # Frequent keys, seen at least twice
+        self.b1 = self._recency_list()  # Ghosts of keys evicted from t1
+        self.b2 = self._recency_list()  # Ghosts of keys evicted from t2
+        self.p = 0  # Target size of t1
+        self._incoming = None
+
+    def _before_insert(self, key):
+        """
+        Adapt p when a ghost of the incoming key is found
+
+        Args:
+            key: Key about to be added
+        """
+        capacity = self._capacity()
+        if key in self.b1:
+            delta = max(len(self.b2) / len(self.b1), 1)
+            self.p = min(capacity, self.p + delta)
+        elif key in self.b2:
+            delta = max(len(self.b1) / len(self.b2), 1)
+            self.p = max(0, self.p - delta)
+        self._incoming = key
+
+    def _on_insert(self, key):
+        """
+        Place a new key in t1, or in t2 if it comes back from a ghost list
+
+        Args:
+            key: Key that was added
+        """
+        if key in self.b1 or key in self.b2:
+            self.b1.discard(key)
+            self.b2.discard(key)
+            self.t2.touch(key)
+        else:
+            self.t1.touch(key)
+        self._incoming = None
+        self._trim_ghosts()
+
+    def _on_update(self, key):
+        """
+        Promote an updated key to the frequent list
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self._promote(key)
+
+    def _on_access(self, key):
+        """
+        Promote a key that was read to the frequent list
+
+        Args:
+            key: Key that was read
+        """
+        self._promote(key)
+
+    def _promote(self, key):
+        """Move a cached key to the most recent end of t2"""
+        self.t1.discard(key)
+        self.t2.touch(key)
+
+    def _on_evict(self, key):
+        """
+        Remember an evicted key in the ghost list matching its origin
+
+        Args:
+            key: Key about to be evicted
+        """
+        if key in self.t1:
+            self.b1.touch(key)
+        elif key in self.t2:
+            self.b2.touch(key)
+
+    def _on_remove(self, key):
+        """
+        Drop a key from the cached lists
+
+        Args:
+            key: Key that left the cache
+        """
+        self.t1.discard(key)
+        self.t2.discard(key)
+
+    def _trim_ghosts(self):
+        """Keep |T1| + |B1| <= c and the whole directory within 2c"""
+        capacity = self._capacity()
+        while self.b1 and len(self.t1) + len(self.b1) > capacity:
+            self.b1.pop_oldest()
+        while (self.b1 or self.b2) and len(self.t1) + len(self.t2) + \
+                len(self.b1) + len(self.b2) > 2 * capacity:
+            if self.b2:
+                self.b2.pop_oldest()
+            else:
+                self.b1.pop_oldest()
+
+    def _pick_victim(self):
+        """
+        Choose between the LRU ends of t1 and t2 following p
+
+        Returns:
+            The key to discard
+        """
+        incoming_in_b2 = self._incoming is not None and \
+            self._incoming in self.b2
+        t1_size = len(self.t1)
+        if self.t1 and (not self.t2 or t1_size > self.p or
+                        (incoming_in_b2 and t1_size == self.p)):
+            return self.t1.oldest()
+        return self.t2.oldest()
+
+
+if __name__ == "__main__":
+    """Test the ARCCache"""
+    my_cache = ARCCache()
+    my_cache.add_listener(print_discard)
+    my_cache.put("A", "Hello")
+    my_cache.put("B", "World")
+    my_cache.put("C", "Holberton")
+    my_cache.put("D", "School")
+    my_cache.print_cache()
+    print(my_cache.get("B"))
+    print(my_cache.get("C"))
+    my_cache.put("E", "Battery")
+    my_cache.print_cache()
+    my_cache.put("F", "Mission")
+    my_cache.print_cache()
+    my_cache.put("A", "Street")
+    my_cache.print_cache()
+    print(my_cache.get("B"))
+    print(my_cache.get("C"))
+    my_cache.put("G", "San Francisco")
+    my_cache.print_cache()
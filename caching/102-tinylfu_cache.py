@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+W-TinyLFU Cache Module
+Implements a Window TinyLFU caching system
+"""
+
+from base_caching import BaseCaching, print_discard
+from count_min_sketch import CountMinSketch
+
+
+class TinyLFUCache(BaseCaching):
+    """
+    TinyLFUCache class that implements the W-TinyLFU policy
+
+    New keys enter a small LRU window. When the window overflows its
+    oldest key competes with the oldest key of the main region, a
+    segmented LRU (probation then protected), and only the one the
+    count-min sketch has seen more often is kept. A burst of one-hit
+    keys therefore churns through the window without touching hot keys
+    """
+    SNAPSHOT_ATTRS = ("window", "probation", "protected")
+
+    def __init__(self, max_items=None, window_ratio=0.01,
+                 protected_ratio=0.8, sketch_width=None, **kwargs):
+        """
+        Initialize the W-TinyLFU cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            window_ratio: Share of the capacity given to the window
+            protected_ratio: Share of the main region that is protected
+            sketch_width: Counters per row of the sketch, defaults to
+                max_items; when only max_weight bounds the cache, the
+                sketch starts small and doubles as the items outgrow it
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.window_ratio = window_ratio
+        self.protected_ratio = protected_ratio
+        self.window = self._recency_list()
+        self.probation = self._recency_list()
+        self.protected = self._recency_list()
+        self.sketch_width = sketch_width
+        self.sketch = CountMinSketch(width=sketch_width or self._capacity())
+
+    def _counts(self):
+        """Return the sketch estimate of every cached key"""
+        estimate = self.sketch.estimate
+        return {key: estimate(key) for key in self.cache_data}
+
+    def _refill_sketch(self, width, counts):
+        """Replace the sketch with a new one holding only some counts"""
+        self.sketch = CountMinSketch(width=width, depth=self.sketch.depth)
+        increment = self.sketch.increment
+        for key, count in counts.items():
+            for _ in range(count):
+                increment(key)
+
+    def _grow_sketch(self):
+        """Double the sketch width, keeping the counts of cached keys"""
+        self._refill_sketch(2 * self.sketch.width, self._counts())
+
+    def _dump_state(self):
+        """
+        Save the counts of the cached keys rather than the sketch
+
+        The sketch indexes keys by hash(), which is salted per process
+        for str and bytes, so its counters would belong to other keys
+        after a restart
+
+        Returns:
+            Dictionary of the regions and of the cached keys' counts
+        """
+        state = super()._dump_state()
+        state["counts"] = self._counts()
+        return state
+
+    def _load_state(self, state):
+        """
+        Restore the regions and count the cached keys in a new sketch
+
+        Args:
+            state: Dictionary returned by _dump_state
+        """
+        state = dict(state)
+        counts = state.pop("counts")
+        super()._load_state(state)
+        self._refill_sketch(self.sketch_width or self._capacity(), counts)
+
+    def _window_limit(self):
+        """Return the maximum number of keys in the window"""
+        return max(1, int(self._capacity() * self.window_ratio))
+
+    def _protected_limit(self):
+        """Return the maximum number of keys in the protected segment"""
+        main = self._capacity() - self._window_limit()
+        return max(1, int(main * self.protected_ratio))
+
+    def _on_insert(self, key):
+        """
+        Count a new key and put it in the window
+
+        Args:
+            key: Key that was added
+        """
+        if self.max_items is None and self.sketch_width is None and \
+                len(self.cache_data) > self.sketch.width:
+            self._grow_sketch()
+        self.sketch.increment(key)
+        self.window.touch(key)
+        # While the main region has room the window simply spills into it
+        main_size = len(self.probation) + len(self.protected)
+        if len(self.window) > self._window_limit() and \
+                main_size < self._capacity() - self._window_limit():
+            self.probation.touch(self.window.pop_oldest())
+
+    def _on_update(self, key):
+        """
+        Count an update as a use of the key
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self._on_access(key)
+
+    def _on_access(self, key):
+        """
+        Count a read and refresh the key in its region
+
+        Args:
+            key: Key that was read
+        """
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.touch(key)
+        elif key in self.probation:
+            # A second use in the main region earns protection
+            self.probation.discard(key)
+            self.protected.touch(key)
+            if len(self.protected) > self._protected_limit():
+                self.probation.touch(self.protected.pop_oldest())
+        else:
+            self.protected.touch(key)
+
+    def _on_remove(self, key):
+        """
+        Drop a key from whichever region holds it
+
+        Args:
+            key: Key that left the cache
+        """
+        self.window.discard(key)
+        self.probation.discard(key)
+        self.protected.discard(key)
+
+    def _main_victim(self):
+        """Return the key the main region would give up, or None"""
+        victim = self.probation.oldest()
+        if victim is None:
+            victim = self.protected.oldest()
+        return victim
+
+    def _pick_victim(self):
+        """
+        Let the window's oldest key compete with the main region's victim
+
+        Returns:
+            The key to discard
+        """
+        victim = self._main_victim()
+        if len(self.window) < self._window_limit() and victim is not None:
+            return victim
+        candidate = self.window.oldest()
+        if candidate is None:
+            return victim
+        if victim is None:
+            return candidate
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            # The candidate is admitted to the main region in place of
+            # the victim, which is evicted
+            self.window.discard(candidate)
+            self.probation.touch(candidate)
+            return victim
+        return candidate
+
+
+if __name__ == "__main__":
+    """Test the TinyLFUCache"""
+    my_cache = TinyLFUCache()
+    my_cache.add_listener(print_discard)
+    my_cache.put("A", "Hello")
+    my_cache.put("B", "World")
+    my_cache.put("C", "Holberton")
+    my_cache.put("D", "School")
+    my_cache.print_cache()
+    print(my_cache.get("B"))
+    print(my_cache.get("B"))
+    print(my_cache.get("C"))
+    my_cache.put("E", "Battery")
+    my_cache.print_cache()
+    my_cache.put("F", "Mission")
+    my_cache.print_cache()
+    my_cache.put("G", "San Francisco")
+    my_cache.print_cache()
+    print(my_cache.get("B"))
+    print(my_cache.get("C"))
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+CLOCK Cache Module
+Implements the CLOCK and CLOCK-Pro caching systems
+"""
+
+from base_caching import BaseCaching, print_discard
+
+HOT, COLD, TEST = "hot", "cold", "test"
+
+
+class ClockCache(BaseCaching):
+    """
+    ClockCache class that implements the CLOCK (second chance) policy
+
+    Keys sit in a circular array of slots with one reference bit each.
+    A hit only sets the bit of its slot and never reorders anything, so
+    reads are as cheap as a dict lookup and a byte store. To evict, the
+    hand sweeps the ring, clearing set bits, and stops on the first key
+    whose bit is already clear
+    """
+    SNAPSHOT_ATTRS = ("ring", "referenced", "slots", "free_slots", "hand")
+
+    def __init__(self, max_items=None, **kwargs):
+        """
+        Initialize the CLOCK cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.ring = []  # Key held by each slot, None when free
+        self.referenced = bytearray()  # Reference bit of each slot
+        self.slots = {}  # key -> slot index
+        self.free_slots = []
+        self.hand = 0
+
+    def _on_insert(self, key):
+        """
+        Give a new key a free slot with its reference bit cleared
+
+        Args:
+            key: Key that was added
+        """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.ring[slot] = key
+            self.referenced[slot] = 0
+        else:
+            slot = len(self.ring)
+            self.ring.append(key)
+            self.referenced.append(0)
+        self.slots[key] = slot
+
+    def _on_update(self, key):
+        """
+        Set the reference bit of an updated key
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self.referenced[self.slots[key]] = 1
+
+    def _on_access(self, key):
+        """
+        Set the reference bit of a key that was read
+
+        Args:
+            key: Key that was read
+        """
+        self.referenced[self.slots[key]] = 1
+
+    def _on_remove(self, key):
+        """
+        Free the slot of a key
+
+        Args:
+            key: Key that left the cache
+        """
+        slot = self.slots.pop(key)
+        self.ring[slot] = None
+        self.free_slots.append(slot)
+
+    def _pick_victim(self):
+        """
+        Sweep the hand until a key without its reference bit is found
+
+        Returns:
+            The key to discard
+        """
+        ring = self.ring
+        referenced = self.referenced
+        size = len(ring)
+        while True:
+            slot = self.hand
+            self.hand = (slot + 1) % size
+            key = ring[slot]
+            if key is None:
+                continue
+            if referenced[slot]:
+                referenced[slot] = 0  # Second chance
+                continue
+            return key
+
+
+class _ClockProEntry():
+    """
+    Node of the CLOCK-Pro ring, resident (hot or cold) or test
+    """
+    __slots__ = ("key", "status", "referenced", "prev", "next")
+
+    def __init__(self, key, status):
+        """
+        Initialize a ring entry
+
+        Args:
+            key: Key tracked by the entry
+            status: HOT, COLD or TEST
+        """
+        self.key = key
+        self.status = status
+        self.referenced = False
+        self.prev = self
+        self.next = self
+
+
+class ClockProCache(BaseCaching):
+    """
+    ClockProCache class that implements the CLOCK-Pro policy
+
+    Resident keys are hot or cold, and evicted cold keys stay on the ring
+    as test entries without their value. A cold key used again during
+    its test period comes back hot and grows the cold target, while
+    test periods that end unused shrink it. Three hands share one ring:
+    the cold hand evicts, the hot hand demotes idle hot keys and the
+    test hand bounds the number of test entries. As with CLOCK, a hit
+    only sets a reference flag
+    """
+
+    def __init__(self, max_items=None, **kwargs):
+        """
+        Initialize the CLOCK-Pro cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.entries = {}  # key -> _ClockProEntry, resident or test
+        self.hand_hot = None
+        self.hand_cold = None
+        self.hand_test = None
+        self.count_hot = 0
+        self.count_cold = 0
+        self.count_test = 0
+        self.cold_target = self._capacity()
+        self._returning = False
+
+    def _link(self, entry):
+        """Insert an entry just behind the hot hand, its newest position"""
+        self.entries[entry.key] = entry
+        if self.hand_hot is None:
+            self.hand_hot = self.hand_cold = self.hand_test = entry
+            return
+        anchor = self.hand_hot
+        entry.next = anchor
+        entry.prev = anchor.prev
+        anchor.prev.next = entry
+        anchor.prev = entry
+
+    def _unlink(self, entry):
+        """Take an entry off the ring, moving any hand that points to it"""
+        del self.entries[entry.key]
+        if entry.next is entry:
+            self.hand_hot = self.hand_cold = self.hand_test = None
+            return
+        if self.hand_hot is entry:
+            self.hand_hot = entry.next
+        if self.hand_cold is entry:
+            self.hand_cold = entry.next
+        if self.hand_test is entry:
+            self.hand_test = entry.next
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    def _end_test(self, entry):
+        """Drop a test entry whose key was not used again in time"""
+        self._unlink(entry)
+        self.count_test -= 1
+        self.cold_target = max(1, self.cold_target - 1)
+
+    def _run_hand_hot(self):
+        """Move the hot hand one step, demoting an idle hot key"""
+        entry = self.hand_hot
+        self.hand_hot = entry.next
+        if entry.status == HOT:
+            if entry.referenced:
+                entry.referenced = False
+            else:
+                entry.status = COLD
+                self.count_hot -= 1
+                self.count_cold += 1
+        elif entry.status == TEST:
+            self._end_test(entry)
+
+    def _run_hand_test(self):
+        """Move the test hand one step, ending a test period"""
+        entry = self.hand_test
+        self.hand_test = entry.next
+        if entry.status == TEST:
+            self._end_test(entry)
+
+    def _balance_hot(self):
+        """Demote hot keys until they fit beside the cold target"""
+        hot_limit = max(self._capacity() - self.cold_target, 0)
+        while self.count_hot > hot_limit:
+            self._run_hand_hot()
+
+    def _before_insert(self, key):
+        """
+        Recognize a key coming back during its test period
+
+        Args:
+            key: Key about to be added
+        """
+        entry = self.entries.get(key)
+        self._returning = entry is not None and entry.status == TEST
+        if self._returning:
+            # Reused while in test: cold keys need more room
+            self.cold_target = min(self._capacity(), self.cold_target + 1)
+            self._unlink(entry)
+            self.count_test -= 1
+
+    def _on_insert(self, key):
+        """
+        Put a new key on the ring, hot if it was in its test period
+
+        Args:
+            key: Key that was added
+        """
+        if self._returning:
+            self._link(_ClockProEntry(key, HOT))
+            self.count_hot += 1
+        else:
+            self._link(_ClockProEntry(key, COLD))
+            self.count_cold += 1
+        self._returning = False
+        self._balance_hot()
+
+    def _on_update(self, key):
+        """
+        Flag an updated key as referenced
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self.entries[key].referenced = True
+
+    def _on_access(self, key):
+        """
+        Flag a key that was read as referenced
+
+        Args:
+            key: Key that was read
+        """
+        self.entries[key].referenced = True
+
+    def _pick_victim(self):
+        """
+        Sweep the cold hand until an unreferenced cold key is found
+
+        Referenced cold keys met on the way are promoted to hot. Under a
+        weight budget the cache can be full with fewer items than its
+        capacity, all of them hot; the hot hand then demotes one first
+
+        Returns:
+            The key to discard, None if nothing is resident
+        """
+        while True:
+            if not self.count_cold:
+                if not self.count_hot:
+                    return None
+                while not self.count_cold:
+                    self._run_hand_hot()
+            entry = self.hand_cold
+            if entry.status == COLD:
+                if not entry.referenced:
+                    return entry.key
+                entry.status = HOT
+                entry.referenced = False
+                self.count_cold -= 1
+                self.count_hot += 1
+            self.hand_cold = entry.next
+            self._balance_hot()
+
+    def _on_evict(self, key):
+        """
+        Keep an evicted cold key on the ring as a test entry
+
+        Args:
+            key: Key about to be evicted
+        """
+        entry = self.entries[key]
+        entry.status = TEST
+        self.count_cold -= 1
+        self.count_test += 1
+        if self.hand_cold is entry:
+            self.hand_cold = entry.next
+        while self.count_test > self._capacity():
+            self._run_hand_test()
+
+    def _on_remove(self, key):
+        """
+        Drop a resident key from the ring, test entries stay
+
+        Args:
+            key: Key that left the cache
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.status == TEST:
+            return
+        if entry.status == HOT:
+            self.count_hot -= 1
+        else:
+            self.count_cold -= 1
+        self._unlink(entry)
+
+    def _dump_state(self):
+        """
+        Flatten the ring, which is too deep a chain of nodes to pickle
+
+        Returns:
+            Dictionary of the ring from the hot hand on and of the
+            positions of the other hands
+        """
+        ring = []
+        position = {}
+        entry = self.hand_hot
+        while entry is not None and entry not in position:
+            position[entry] = len(ring)
+            ring.append((entry.key, entry.status, entry.referenced))
+            entry = entry.next
+        return {
+            "ring": ring,
+            "hand_cold": position.get(self.hand_cold),
+            "hand_test": position.get(self.hand_test),
+            "cold_target": self.cold_target,
+        }
+
+    def _load_state(self, state):
+        """
+        Relink the ring flattened by _dump_state
+
+        Args:
+            state: Dictionary returned by _dump_state
+        """
+        self.entries = {}
+        self.hand_hot = self.hand_cold = self.hand_test = None
+        self.count_hot = self.count_cold = self.count_test = 0
+        nodes = []
+        for key, status, referenced in state["ring"]:
+            entry = _ClockProEntry(key, status)
+            entry.referenced = referenced
+            self._link(entry)
+            nodes.append(entry)
+            if status == HOT:
+                self.count_hot += 1
+            elif status == COLD:
+                self.count_cold += 1
+            else:
+                self.count_test += 1
+        if nodes:
+            self.hand_cold = nodes[state["hand_cold"]]
+            self.hand_test = nodes[state["hand_test"]]
+        self.cold_target = state["cold_target"]
+
+
+if __name__ == "__main__":
+    """Test the ClockCache and ClockProCache"""
+    for cache_class in (ClockCache, ClockProCache):
+        print(cache_class.__name__)
+        my_cache = cache_class()
+        my_cache.add_listener(print_discard)
+        my_cache.put("A", "Hello")
+        my_cache.put("B", "World")
+        my_cache.put("C", "Holberton")
+        my_cache.put("D", "School")
+        my_cache.print_cache()
+        print(my_cache.get("B"))
+        my_cache.put("E", "Battery")
+        my_cache.print_cache()
+        my_cache.put("A", "Street")
+        my_cache.print_cache()
+        print(my_cache.get("A"))
+        print(my_cache.get("B"))
+        my_cache.put("F", "Mission")
+        my_cache.print_cache()
+        my_cache.put("G", "San Francisco")
+        my_cache.print_cache()
+
+    # Weight alone can fill the cache while every resident key is hot
+    my_cache = ClockProCache(max_items=4, max_weight=10,
+                             weigher=lambda key, item: item)
+    my_cache.add_listener(print_discard)
+    for key, weight in (("C", 2), ("E", 4), ("A", 6), ("C", 4), ("A", 6),
+                        ("B", 6)):
+        my_cache.put(key, weight)
+    my_cache.print_cache()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+SLRU and 2Q Cache Module
+Implements the Segmented LRU and 2Q caching systems
+"""
+
+from base_caching import BaseCaching, print_discard
+
+
+class SLRUCache(BaseCaching):
+    """
+    SLRUCache class that implements a Segmented LRU caching system
+
+    New keys enter a probationary segment and only move to the
+    protected segment when they are used again. Victims are taken from
+    the probationary segment first, so a one-time scan only churns
+    through it and never evicts the protected working set
+    """
+    SNAPSHOT_ATTRS = ("probation", "protected")
+
+    def __init__(self, max_items=None, protected_ratio=0.8, **kwargs):
+        """
+        Initialize the SLRU cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            protected_ratio: Share of the capacity for the protected
+                segment
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.protected_ratio = protected_ratio
+        self.probation = self._recency_list()
+        self.protected = self._recency_list()
+
+    def _protected_limit(self):
+        """Return the maximum number of keys in the protected segment"""
+        return max(1, int(self._capacity() * self.protected_ratio))
+
+    def _on_insert(self, key):
+        """
+        Put a new key at the most recent end of the probationary segment
+
+        Args:
+            key: Key that was added
+        """
+        self.probation.touch(key)
+
+    def _on_update(self, key):
+        """
+        Treat an update as a use of the key
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self._on_access(key)
+
+    def _on_access(self, key):
+        """
+        Protect a key used again, demoting the oldest protected key
+        back to probation when the protected segment overflows
+
+        Args:
+            key: Key that was read
+        """
+        if key in self.probation:
+            self.probation.discard(key)
+            self.protected.touch(key)
+            if len(self.protected) > self._protected_limit():
+                self.probation.touch(self.protected.pop_oldest())
+        else:
+            self.protected.touch(key)
+
+    def _on_remove(self, key):
+        """
+        Drop a key from its segment
+
+        Args:
+            key: Key that left the cache
+        """
+        self.probation.discard(key)
+        self.protected.discard(key)
+
+    def _pick_victim(self):
+        """
+        Choose the least recently used probationary key, if any
+
+        Returns:
+            The key to discard
+        """
+        victim = self.probation.oldest()
+        if victim is None:
+            victim = self.protected.oldest()
+        return victim
+
+
+class TwoQueueCache(BaseCaching):
+    """
+    TwoQueueCache class that implements the full 2Q caching system
+
+    New keys go to the A1in FIFO. Keys evicted from it are remembered
+    without their value in the A1out ghost FIFO, and only a key found
+    there when it comes back is admitted to the Am LRU. Keys seen once,
+    like those of a scan, therefore never reach Am
+    """
+    SNAPSHOT_ATTRS = ("a1_in", "a1_out", "am")
+
+    def __init__(self, max_items=None, in_ratio=0.25, out_ratio=0.5,
+                 **kwargs):
+        """
+        Initialize the 2Q cache
+
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            in_ratio: Share of the capacity for A1in (Kin)
+            out_ratio: Number of A1out ghosts relative to the capacity
+                (Kout)
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.in_ratio = in_ratio
+        self.out_ratio = out_ratio
+        self.a1_in = self._recency_list()  # FIFO of keys seen once
+        self.a1_out = self._recency_list()  # FIFO of ghosts evicted from a1_in
+        self.am = self._recency_list()  # LRU of keys seen again
+        self._returning = False
+
+    def _before_insert(self, key):
+        """
+        Recognize a key that is remembered in A1out
+
+        Args:
+            key: Key about to be added
+        """
+        self._returning = key in self.a1_out
+        if self._returning:
+            self.a1_out.discard(key)
+
+    def _on_insert(self, key):
+        """
+        Put a new key in A1in, or in Am if it was a ghost
+
+        Args:
+            key: Key that was added
+        """
+        if self._returning:
+            self.am.touch(key)
+        else:
+            self.a1_in.push(key)
+        self._returning = False
+
+    def _on_update(self, key):
+        """
+        Treat an update as a use of the key
+
+        Args:
+            key: Key whose value was replaced
+        """
+        self._on_access(key)
+
+    def _on_access(self, key):
+        """
+        Refresh a key of Am, keys of A1in keep their FIFO position
+
+        Args:
+            key: Key that was read
+        """
+        if key in self.am:
+            self.am.touch(key)
+
+    def _on_evict(self, key):
+        """
+        Remember a key evicted from A1in as a ghost
+
+        Args:
+            key: Key about to be evicted
+        """
+        if key in self.a1_in:
+            self.a1_out.push(key)
+            ghost_limit = max(1, int(self._capacity() * self.out_ratio))
+            while len(self.a1_out) > ghost_limit:
+                self.a1_out.pop_oldest()
+
+    def _on_remove(self, key):
+        """
+        Drop a key from the resident queues
+
+        Args:
+            key: Key that left the cache
+        """
+        self.a1_in.discard(key)
+        self.am.discard(key)
+
+    def _pick_victim(self):
+        """
+        Take from A1in once it exceeds Kin, from Am otherwise
+
+        Returns:
+            The key to discard
+        """
+        in_limit = max(1, int(self._capacity() * self.in_ratio))
+        if len(self.a1_in) > in_limit or not self.am:
+            return self.a1_in.oldest()
+        return self.am.oldest()
+
+
+if __name__ == "__main__":
+    """Test the SLRUCache and TwoQueueCache"""
+    for cache_class in (SLRUCache, TwoQueueCache):
+        print(cache_class.__name__)
+        my_cache = cache_class()
+        my_cache.add_listener(print_discard)
+        my_cache.put("A", "Hello")
+        my_cache.put("B", "World")
+        my_cache.put("C", "Holberton")
+        my_cache.put("D", "School")
+        print(my_cache.get("A"))
+        print(my_cache.get("B"))
+        my_cache.put("E", "Battery")
+        my_cache.print_cache()
+        my_cache.put("C", "Street")
+        my_cache.print_cache()
+        my_cache.put("F", "Mission")
+        my_cache.print_cache()
+        my_cache.put("G", "San Francisco")
+        my_cache.print_cache()
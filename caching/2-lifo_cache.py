@@ -4,7 +4,7 @@ LIFO Cache Module
 Implements a Last-In-First-Out caching system
 """
 
-from base_caching import BaseCaching
+from base_caching import BaseCaching, print_discard
 
 
 class LIFOCache(BaseCaching):
@@ -12,52 +12,51 @@ class LIFOCache(BaseCaching):
     LIFOCache class that implements a Last-In-First-Out caching system
     Discards the most recently added item when the cache is full
     """
+    SNAPSHOT_ATTRS = ("keys_stack",)
 
-    def __init__(self):
-        """Initialize the LIFO cache"""
-        super().__init__()
-        self.keys_stack = []  # Stack to track insertion order
-
-    def put(self, key, item):
+    def __init__(self, max_items=None, **kwargs):
         """
-        Add an item to the cache using LIFO algorithm
+        Initialize the LIFO cache
 
         Args:
-            key: Key to identify the item
-            item: Value to be stored in cache
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
+        """
+        super().__init__(max_items, **kwargs)
+        self.keys_stack = self._recency_list()  # Stack of insertion order
+
+    def _on_insert(self, key):
         """
-        if key is not None and item is not None:
-            # If cache is full and key is new, remove last inserted item
-            if (len(self.cache_data) >= BaseCaching.MAX_ITEMS
-                    and key not in self.cache_data):
-                last_key = self.keys_stack[-1]
-                print(f"DISCARD: {last_key}")
-                del self.cache_data[last_key]
-                self.keys_stack.pop()
+        Push a new key, updates keep their original position
 
-            # Add or update the key
-            if key not in self.cache_data:
-                self.keys_stack.append(key)
-            self.cache_data[key] = item
+        Args:
+            key: Key that was added
+        """
+        self.keys_stack.push(key)
 
-    def get(self, key):
+    def _on_remove(self, key):
         """
-        Retrieve an item from the cache by key
+        Drop a key from the stack
 
         Args:
-            key: Key to identify the item
+            key: Key that left the cache
+        """
+        self.keys_stack.discard(key)
+
+    def _pick_victim(self):
+        """
+        Choose the last key that was inserted
 
         Returns:
-            The value associated with the key, or None if not found
+            The key on top of the stack
         """
-        if key is None or key not in self.cache_data:
-            return None
-        return self.cache_data.get(key)
+        return self.keys_stack.newest()
 
 
 if __name__ == "__main__":
     """Test the LIFOCache"""
     my_cache = LIFOCache()
+    my_cache.add_listener(print_discard)
     my_cache.put("A", "Hello")
     my_cache.put("B", "World")
     my_cache.put("C", "Holberton")
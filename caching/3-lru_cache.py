@@ -4,7 +4,7 @@ LRU Cache Module
 Implements a Least Recently Used caching system
 """
 
-from base_caching import BaseCaching
+from base_caching import BaseCaching, print_discard
 
 
 class LRUCache(BaseCaching):
@@ -12,56 +12,69 @@ class LRUCache(BaseCaching):
     LRUCache class that implements a Least Recently Used caching system
     Discards the least recently accessed item when the cache is full
     """
+    SNAPSHOT_ATTRS = ("access_order",)
 
-    def __init__(self):
-        """Initialize the LRU cache"""
-        super().__init__()
-        self.access_order = []  # Track access order (most recent at end)
+    def __init__(self, max_items=None, **kwargs):
+        """
+        Initialize the LRU cache
 
-    def put(self, key, item):
+        Args:
+            max_items: Capacity of the cache, defaults to MAX_ITEMS
+            kwargs: Options forwarded to BaseCaching, such as max_weight
         """
-        Add an item to the cache using LRU algorithm
+        super().__init__(max_items, **kwargs)
+        self.access_order = self._recency_list()  # Most recent at the end
+
+    def _on_insert(self, key):
+        """
+        Mark a new key as the most recently used
 
         Args:
-            key: Key to identify the item
-            item: Value to be stored in cache
+            key: Key that was added
         """
-        if key is not None and item is not None:
-            # If key exists, remove from current position
-            if key in self.cache_data:
-                self.access_order.remove(key)
-            # If cache is full and key is new, remove LRU item
-            elif len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                lru_key = self.access_order.pop(0)
-                del self.cache_data[lru_key]
-                print(f"DISCARD: {lru_key}")
-
-            # Add key to end (most recent)
-            self.access_order.append(key)
-            self.cache_data[key] = item
-
-    def get(self, key):
+        self.access_order.touch(key)
+
+    def _on_update(self, key):
         """
-        Retrieve an item from the cache by key and update access order
+        Mark an updated key as the most recently used
 
         Args:
-            key: Key to identify the item
+            key: Key whose value was replaced
+        """
+        self.access_order.touch(key)
 
-        Returns:
-            The value associated with the key, or None if not found
+    def _on_access(self, key):
+        """
+        Mark a key that was read as the most recently used
+
+        Args:
+            key: Key that was read
         """
-        if key is None or key not in self.cache_data:
-            return None
+        self.access_order.touch(key)
 
-        # Move key to end (most recent)
-        self.access_order.remove(key)
-        self.access_order.append(key)
-        return self.cache_data.get(key)
+    def _on_remove(self, key):
+        """
+        Drop a key from the access order
+
+        Args:
+            key: Key that left the cache
+        """
+        self.access_order.discard(key)
+
+    def _pick_victim(self):
+        """
+        Choose the least recently used key
+
+        Returns:
+            The oldest key in the access order
+        """
+        return self.access_order.oldest()
 
 
 if __name__ == "__main__":
     """Test the LRUCache"""
     my_cache = LRUCache()
+    my_cache.add_listener(print_discard)
     my_cache.put("A", "Hello")
     my_cache.put("B", "World")
     my_cache.put("C", "Holberton")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Async Cache Module
+asyncio facade over the caching policies
+"""
+
+import asyncio
+import inspect
+from policies import get_policy
+
+
+def _retrieve(load):
+    """Mark the outcome of a load as seen, even if nobody awaited it"""
+    if not load.cancelled():
+        load.exception()
+
+
+class AsyncCache():
+    """
+    AsyncCache lets coroutines share one cache without blocking the loop
+
+    Every operation runs on the event loop thread, so the wrapped policy
+    needs no lock. Misses on the same key share one task, so a loader
+    runs once while the coroutines await its result, and expired entries
+    are swept by a callback scheduled on the loop
+    """
+
+    def __init__(self, cache=None, policy="LRU", sweep_interval=1.0,
+                 **kwargs):
+        """
+        Initialize the facade
+
+        Args:
+            cache: BaseCaching instance to wrap, built from policy and
+                kwargs when None
+            policy: Policy name or cache class used when cache is None
+            sweep_interval: Seconds between two expiration sweeps
+            kwargs: Options for the policy, such as max_items
+        """
+        if cache is None:
+            cache = get_policy(policy)(**kwargs)
+        self.cache = cache
+        self.sweep_interval = sweep_interval
+        self._loads = {}  # key -> Task of the load in progress
+        self._sweeper = None
+
+    def _start_sweeper(self):
+        """Schedule the expiration sweep on the running loop, once"""
+        if self._sweeper is None:
+            loop = asyncio.get_running_loop()
+            self._sweeper = loop.call_later(self.sweep_interval,
+                                            self._sweep)
+
+    def _sweep(self):
+        """Drop expired entries and schedule the next sweep"""
+        self.cache.expire()
+        loop = asyncio.get_running_loop()
+        self._sweeper = loop.call_later(self.sweep_interval, self._sweep)
+
+    async def get(self, key):
+        """
+        Retrieve an item from the cache
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            The value associated with the key, or None if not found
+        """
+        return self.cache.get(key)
+
+    async def put(self, key, item, ttl=None):
+        """
+        Add an item to the cache
+
+        Args:
+            key: Key to identify the item
+            item: Value to be stored in cache
+            ttl: Seconds before the item expires, None to keep it
+        """
+        if ttl is not None:
+            self._start_sweeper()
+        self.cache.put(key, item, ttl)
+
+    async def delete(self, key):
+        """
+        Remove an item from the cache
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        return self.cache.delete(key)
+
+    async def get_or_load(self, key, loader, ttl=None):
+        """
+        Get an item, awaiting its loader on a miss
+
+        Args:
+            key: Key to identify the item
+            loader: Coroutine function called as loader(key), or an
+                awaitable, producing the value (None is not cached)
+            ttl: Seconds before a loaded item expires, None to keep it
+
+        Returns:
+            The cached or loaded value
+        """
+        item = self.cache.get(key)
+        if item is not None or key is None:
+            if inspect.iscoroutine(loader):
+                loader.close()
+            return item
+
+        load = self._loads.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._load(key, loader, ttl))
+            load.add_done_callback(_retrieve)
+            self._loads[key] = load
+        elif inspect.iscoroutine(loader):
+            loader.close()
+        # shield: a caller being cancelled, the first one included, must
+        # not cancel the load the others await
+        return await asyncio.shield(load)
+
+    async def _load(self, key, loader, ttl):
+        """Run a loader on its own task and store what it returns"""
+        try:
+            if inspect.isawaitable(loader):
+                item = await loader
+            else:
+                item = await loader(key)
+        finally:
+            del self._loads[key]
+        await self.put(key, item, ttl)
+        return item
+
+    def close(self):
+        """Stop the expiration sweep"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def __aenter__(self):
+        """Use the facade as an async context manager"""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Stop the sweep when leaving the context"""
+        self.close()
+
+
+if __name__ == "__main__":
+    """Test the AsyncCache"""
+
+    async def main():
+        """Load one key from many coroutines at once"""
+        calls = []
+
+        async def load_user(key):
+            """Pretend to fetch a user"""
+            calls.append(key)
+            await asyncio.sleep(0.1)
+            return {"id": key}
+
+        async with AsyncCache(max_items=10, sweep_interval=0.05) as cache:
+            users = await asyncio.gather(*[
+                cache.get_or_load("u1", load_user, ttl=0.1)
+                for _ in range(10)])
+            print(len(calls), users[0])
+            await asyncio.sleep(0.2)
+            print(await cache.get("u1"))
+
+    asyncio.run(main())
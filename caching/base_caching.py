@@ -1,32 +1,807 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import os
+import pickle
+import sys
+import time
+from collections import namedtuple
+from cache_stats import CacheStats
+from invalidation import PrefixTrie, TagIndex
+from negative_cache import NegativeCache
+from recency_list import ArrayRecencyList, RecencyList
+from refresh_ahead import Refresher
+from single_flight import SingleFlight
+from timer_wheel import TimerWheel
+
+# Reasons an entry can leave the cache without being asked to
+EVICTED_CAPACITY = "capacity"
+EVICTED_WEIGHT = "weight"
+EVICTED_EXPIRED = "expired"
+
+EvictionEvent = namedtuple("EvictionEvent", ["reason", "key", "value",
+                                             "policy"])
+
+SNAPSHOT_MAGIC = b"CSNP0001"
+
+
+def default_weigher(key, item):
+    """ Estimate the memory held by an entry in bytes
+
+    Args:
+        key: key of the entry
+        item: value of the entry
+
+    Returns:
+        shallow size of the key and the value, as given by sys.getsizeof
+    """
+    return sys.getsizeof(key) + sys.getsizeof(item)
+
+
+def print_discard(event):
+    """ Eviction listener printing the discarded key like the tasks expect
+
+    Args:
+        event: EvictionEvent describing the eviction
+    """
+    print("DISCARD: {}".format(event.key))
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the put/get flow shared by every policy, which only has to
+        implement the _on_* hooks and _pick_victim
     """
     MAX_ITEMS = 4
+    # Attributes holding the policy metadata that dump() saves
+    SNAPSHOT_ATTRS = ()
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_weight=None, weigher=None,
+                 compact=False):
         """ Initiliaze
+
+        Args:
+            max_items: capacity of this instance, defaults to MAX_ITEMS
+                unless a max_weight is given, in which case the number
+                of items is not limited
+            max_weight: total weight the cache may hold, None to only
+                bound the number of items
+            weigher: callable(key, item) returning the weight of an
+                entry, defaults to default_weigher
+            compact: keep the policy order in ArrayRecencyList tables,
+                which take far less memory per key but are slower
+
+        Raises:
+            ValueError: if max_items is less than 1
         """
         self.cache_data = {}
+        if max_items is None and max_weight is None:
+            max_items = self.MAX_ITEMS
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self.max_items = max_items
+        self.max_weight = max_weight
+        self.weigher = weigher if weigher is not None else default_weigher
+        self.compact = compact
+        self.current_weight = 0
+        self._weights = {}
+        self.clock = time.monotonic
+        self._expiry = TimerWheel()
+        self.listeners = []
+        self.stats = None
+        self.samplers = []
+        self.refresher = None
+        self.negatives = None
+        self.tag_index = None
+        self.prefix_index = None
+        self._flights = SingleFlight()
+
+    def _recency_list(self):
+        """ Create the ordering structure the policies track keys with
+
+        Returns:
+            an ArrayRecencyList in compact mode, a RecencyList otherwise
+        """
+        return ArrayRecencyList() if self.compact else RecencyList()
 
     def print_cache(self):
         """ Print the cache
         """
+        self.expire()
         print("Current cache:")
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
+        if self.max_weight is not None:
+            print("Current weight: {}/{}".format(self.current_weight,
+                                                 self.max_weight))
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None, tags=None):
         """ Add an item in the cache
+
+        Args:
+            key: key to identify the item
+            item: value to be stored in cache
+            ttl: seconds before the item expires, None to keep it
+                until it is evicted
+            tags: iterable of tags for invalidate_tag, replacing those
+                of the previous value
+        """
+        if key is None or item is None:
+            return
+        if self.stats is not None:
+            self.stats.record_put(self._put, self.cache_data, key, item, ttl)
+        else:
+            self._put(key, item, ttl)
+        if tags is not None:
+            self._tag(key, tags)
+
+    def _put(self, key, item, ttl):
+        """ Purge expired items, then store an item
         """
-        raise NotImplementedError("put must be implemented in your cache class")
+        self.expire()
+        self._store(key, item, ttl)
+
+    def _tag(self, key, tags):
+        """ Tag a key that was just stored
+        """
+        if key not in self.cache_data:
+            return
+        if self.tag_index is None:
+            self.tag_index = TagIndex()
+        self.tag_index.add(key, tags)
+
+    def _store(self, key, item, ttl):
+        """ Store an item, evicting as the policy decides
+        """
+        if self.tag_index is not None:
+            self.tag_index.discard(key)
+        if self.refresher is not None:
+            self.refresher.forget(key)
+        if self.negatives is not None:
+            self.negatives.discard(key)
+        weight = 0
+        if self.max_weight is not None:
+            weight = self.weigher(key, item)
+            if weight > self.max_weight:
+                # The item can never fit, drop the stale value instead
+                if key in self.cache_data:
+                    self._evict(key, EVICTED_WEIGHT, False)
+                return
+
+        if key in self.cache_data:
+            self.cache_data[key] = item
+            self._on_update(key)
+            if self.max_weight is not None:
+                self.current_weight += weight - self._weights[key]
+                self._weights[key] = weight
+                # A heavier value may push the total over the budget
+                while self.current_weight > self.max_weight:
+                    victim = self._pick_victim()
+                    if victim is None:
+                        break
+                    self._evict(victim, EVICTED_WEIGHT)
+                if key not in self.cache_data:
+                    return
+        else:
+            self._before_insert(key)
+            reason = self._full_reason(weight)
+            while reason is not None:
+                victim = self._pick_victim()
+                if victim is None:
+                    break
+                self._evict(victim, reason)
+                reason = self._full_reason(weight)
+            self.cache_data[key] = item
+            self._on_insert(key)
+            if self.prefix_index is not None:
+                self.prefix_index.add(key)
+            if self.max_weight is not None:
+                self.current_weight += weight
+                self._weights[key] = weight
+
+        if ttl is None:
+            self._expiry.cancel(key)
+        else:
+            now = self.clock()
+            self._expiry.schedule(key, now + ttl, now)
 
     def get(self, key):
         """ Get an item by key
+
+        Args:
+            key: key to identify the item
+
+        Returns:
+            the value associated with the key, or None if it is missing
+            or expired
+        """
+        if self.samplers:
+            for sampler in self.samplers:
+                sampler.record(key)
+        if self.stats is not None:
+            return self.stats.record_get(self._get, key)
+        return self._get(key)
+
+    def _get(self, key):
+        """ Look an item up, honouring its TTL
+        """
+        if key is None or key not in self.cache_data:
+            return None
+        deadline = self._expiry.deadline(key)
+        if deadline is not None and deadline <= self.clock():
+            self._evict(key, EVICTED_EXPIRED, False)
+            return None
+        self._on_access(key)
+        return self.cache_data.get(key)
+
+    def put_many(self, items, ttl=None, tags=None):
+        """ Add several items in one pass
+
+        Expired items are purged once for the whole batch instead of
+        once per item
+
+        Args:
+            items: mapping or iterable of (key, item) pairs
+            ttl: seconds before the items expire, None to keep them
+            tags: iterable of tags given to every item
+        """
+        if tags is not None:
+            tags = tuple(tags)
+        if hasattr(items, "items"):
+            items = items.items()
+        self.expire()
+        stats = self.stats
+        for key, item in items:
+            if key is None or item is None:
+                continue
+            if stats is not None:
+                stats.record_put(self._store, self.cache_data, key, item,
+                                 ttl)
+            else:
+                self._store(key, item, ttl)
+            if tags is not None:
+                self._tag(key, tags)
+
+    def get_many(self, keys):
+        """ Get several items in one pass
+
+        Args:
+            keys: iterable of keys
+
+        Returns:
+            dictionary of the keys that were found and their values
+        """
+        found = {}
+        misses = 0
+        samplers = self.samplers
+        for key in keys:
+            for sampler in samplers:
+                sampler.record(key)
+            item = self._get(key)
+            if item is None:
+                misses += 1
+            else:
+                found[key] = item
+        if self.stats is not None:
+            self.stats.record_lookups(len(found), misses)
+        return found
+
+    def delete_many(self, keys):
+        """ Remove several items in one pass
+
+        Args:
+            keys: iterable of keys
+
+        Returns:
+            the number of keys that were cached and removed
+        """
+        removed = 0
+        for key in keys:
+            if key is not None and key in self.cache_data:
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def delete(self, key):
+        """ Remove an item from the cache
+
+        Explicit removals are not evictions, listeners are not notified
+
+        Args:
+            key: key to identify the item
+
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        if key is None or key not in self.cache_data:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self):
+        """ Remove every item from the cache
+        """
+        for key in list(self.cache_data):
+            self._remove(key)
+        if self.negatives is not None:
+            self.negatives.clear()
+
+    def invalidate_tag(self, tag):
+        """ Remove every item carrying a tag
+
+        Only the tagged keys are visited. Like delete, this does not
+        notify the listeners
+
+        Args:
+            tag: tag given to put
+
+        Returns:
+            the number of items removed
+        """
+        if self.tag_index is None:
+            return 0
+        keys = self.tag_index.keys(tag)
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def invalidate_prefix(self, prefix):
+        """ Remove every item whose str key starts with a prefix
+
+        Only the matching keys are visited once enable_prefix_index was
+        called, otherwise every key is scanned. Like delete, this does
+        not notify the listeners
+
+        Args:
+            prefix: str prefix of the keys to remove
+
+        Returns:
+            the number of items removed
+        """
+        if self.prefix_index is not None:
+            keys = self.prefix_index.keys(prefix)
+        else:
+            keys = [key for key in self.cache_data
+                    if isinstance(key, str) and key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def enable_prefix_index(self):
+        """ Index the str keys in a trie for invalidate_prefix
+
+        The trie costs a dict per distinct key character path, so it
+        only pays off when prefix invalidation is frequent
+
+        Returns:
+            the PrefixTrie now attached to the cache
+        """
+        if self.prefix_index is None:
+            self.prefix_index = PrefixTrie(self.cache_data)
+        return self.prefix_index
+
+    def disable_prefix_index(self):
+        """ Drop the prefix trie, invalidate_prefix scans again
+        """
+        self.prefix_index = None
+
+    def get_or_load(self, key, loader, ttl=None, soft_ttl=None):
+        """ Get an item, loading and storing it on a miss
+
+        Concurrent callers missing on the same key share a single call
+        to loader instead of each running it. The cache itself is not
+        thread-safe, use ShardedCache.get_or_load to share one between
+        threads
+
+        With negative caching enabled, a key the loader returned None
+        for is answered with None without calling loader again until
+        the negative TTL elapses
+
+        With a soft_ttl, an item read after it went stale is returned
+        at once while loader runs again on a background thread, and the
+        new value is stored on a later call. Only the hard ttl makes a
+        caller wait for loader. A soft_ttl shorter than ttl therefore
+        refreshes the keys still in use ahead of their expiry
+
+        Args:
+            key: key to identify the item
+            loader: callable(key) returning the value, None if there is
+                nothing to cache
+            ttl: seconds before a loaded item expires, None to keep it
+            soft_ttl: seconds before a loaded item is stale and reloaded
+                in the background, None to never reload it
+
+        Returns:
+            the cached or loaded value
+        """
+        refresher = self.refresher
+        if refresher is not None and refresher.completed:
+            self._apply_refreshes()
+        item = self.get(key)
+        if item is not None:
+            if refresher is not None:
+                refresher.refresh_if_stale(key, self.clock())
+            return item
+        if key is None or self.is_absent(key):
+            return None
+
+        def load():
+            """ Load the item unless a previous flight just stored it
+            """
+            item = self._get(key)
+            if item is None:
+                item = loader(key)
+                if item is None:
+                    self.mark_absent(key)
+                    return None
+                self.put(key, item, ttl)
+                if soft_ttl is not None and key in self.cache_data:
+                    if self.refresher is None:
+                        self.refresher = Refresher()
+                    self.refresher.track(key, self.clock() + soft_ttl,
+                                         loader, ttl, soft_ttl)
+            return item
+
+        return self._flights.do(key, load)
+
+    def enable_negative_cache(self, ttl=5.0, share=0.1, max_items=None):
+        """ Start remembering absent keys, see negative_cache
+
+        Args:
+            ttl: seconds an absence is trusted
+            share: size of the negative cache relative to max_items
+            max_items: number of absent keys remembered, overrides share
+
+        Returns:
+            the NegativeCache instance now attached to the cache
+        """
+        if max_items is None:
+            if self.max_items is None:
+                raise ValueError("max_items is required when the cache "
+                                 "does not limit its number of items")
+            max_items = share * self.max_items
+        self.negatives = NegativeCache(max_items, ttl, self.clock)
+        return self.negatives
+
+    def disable_negative_cache(self):
+        """ Stop remembering absent keys and forget them
+        """
+        self.negatives = None
+
+    def mark_absent(self, key):
+        """ Remember that a key does not exist, if negative caching is on
+
+        Args:
+            key: key the backing store has nothing for
+        """
+        if self.negatives is not None and key is not None:
+            self.negatives.add(key)
+
+    def is_absent(self, key):
+        """ Check whether a key was recently marked absent
+
+        Args:
+            key: key to identify the item
+
+        Returns:
+            True if the key is known not to exist, False if it is cached
+            or unknown
+        """
+        return self.negatives is not None and self.negatives.check(key)
+
+    def _apply_refreshes(self):
+        """ Store the values reloaded in the background since last time
+        """
+        for key, entry, item in self.refresher.drain():
+            if item is None:
+                self.delete(key)
+                self.mark_absent(key)
+                continue
+            self.put(key, item, entry.ttl)
+            if key in self.cache_data:
+                self.refresher.track(key, self.clock() + entry.soft_ttl,
+                                     entry.loader, entry.ttl,
+                                     entry.soft_ttl)
+
+    def stop_refreshing(self, wait=True):
+        """ Stop the background reloads started by get_or_load
+
+        Args:
+            wait: whether to wait for the reloads in progress
+        """
+        if self.refresher is not None:
+            self.refresher.shutdown(wait)
+            self.refresher = None
+
+    def expire(self):
+        """ Drop every item whose TTL has elapsed
+
+        Only the timer wheel slots that became due are visited, so this
+        is cheap enough to run on every write
+
+        Returns:
+            the number of items removed
+        """
+        if not len(self._expiry):
+            return 0
+        expired = self._expiry.advance(self.clock())
+        for key in expired:
+            self._evict(key, EVICTED_EXPIRED, False)
+        return len(expired)
+
+    def dump(self, path):
+        """ Save the entries and the policy metadata to a file
+
+        The file is a short magic header followed by a pickle, written
+        next to path and renamed over it so a reader never sees half a
+        snapshot. TTLs are saved as the time they had left
+
+        Args:
+            path: file to write
+        """
+        self.expire()
+        now = self.clock()
+        entries = []
+        for key, item in self.cache_data.items():
+            deadline = self._expiry.deadline(key)
+            entries.append((key, item,
+                            None if deadline is None else deadline - now))
+        snapshot = {
+            "policy": type(self).__name__,
+            "saved_at": time.time(),
+            "entries": entries,
+            "state": self._dump_state(),
+        }
+        partial = "{}.tmp".format(path)
+        with open(partial, "wb") as snapshot_file:
+            snapshot_file.write(SNAPSHOT_MAGIC)
+            pickle.dump(snapshot, snapshot_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+
+    def load(self, path):
+        """ Replace the content of the cache with a snapshot from dump()
+
+        The time spent between dump and load counts against the TTLs,
+        and entries that no longer fit the limits of this instance are
+        evicted in policy order
+
+        Args:
+            path: file written by dump() from the same policy
+
+        Raises:
+            ValueError: if the file is not a snapshot of this policy
+        """
+        with open(path, "rb") as snapshot_file:
+            if snapshot_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            snapshot = pickle.load(snapshot_file)
+        if snapshot["policy"] != type(self).__name__:
+            raise ValueError("{} is a snapshot of {}".format(
+                path, snapshot["policy"]))
+
+        self.clear()
+        downtime = max(time.time() - snapshot["saved_at"], 0)
+        now = self.clock()
+        expired = []
+        for key, item, ttl in snapshot["entries"]:
+            self.cache_data[key] = item
+            if self.prefix_index is not None:
+                self.prefix_index.add(key)
+            if self.max_weight is not None:
+                weight = self.weigher(key, item)
+                self.current_weight += weight
+                self._weights[key] = weight
+            if ttl is None:
+                continue
+            ttl -= downtime
+            if ttl > 0:
+                self._expiry.schedule(key, now + ttl, now)
+            else:
+                expired.append(key)
+        self._load_state(snapshot["state"])
+
+        for key in expired:
+            self._remove(key)
+        while True:
+            if self.max_items is not None and \
+                    len(self.cache_data) > self.max_items:
+                reason = EVICTED_CAPACITY
+            elif self.max_weight is not None and \
+                    self.current_weight > self.max_weight:
+                reason = EVICTED_WEIGHT
+            else:
+                break
+            victim = self._pick_victim()
+            if victim is None:
+                break
+            self._evict(victim, reason)
+
+    def _dump_state(self):
+        """ Collect the policy metadata saved by dump()
+
+        Returns:
+            dictionary of the SNAPSHOT_ATTRS attributes
+        """
+        return {name: getattr(self, name) for name in self.SNAPSHOT_ATTRS}
+
+    def _load_state(self, state):
+        """ Restore the policy metadata collected by _dump_state
+
+        Args:
+            state: dictionary returned by _dump_state
+        """
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def enable_stats(self, sample_every=64):
+        """ Start recording statistics, see cache_stats.CacheStats
+
+        Args:
+            sample_every: time one get or put out of this many
+
+        Returns:
+            the CacheStats instance now attached to the cache
+        """
+        if self.stats is None:
+            self.stats = CacheStats(sample_every)
+        return self.stats
+
+    def disable_stats(self):
+        """ Stop recording statistics and drop the counters
+        """
+        self.stats = None
+
+    def stats_snapshot(self):
+        """ Get the current statistics of the cache
+
+        Returns:
+            dictionary of the counters plus the current size and weight,
+            None if stats are not enabled
+        """
+        if self.stats is None:
+            return None
+        snapshot = self.stats.snapshot()
+        snapshot["size"] = len(self.cache_data)
+        snapshot["weight"] = self.current_weight
+        return snapshot
+
+    def reset_stats(self):
+        """ Set the statistics back to zero if they are enabled
+        """
+        if self.stats is not None:
+            self.stats.reset()
+
+    def add_listener(self, listener):
+        """ Register a callable notified of every eviction
+
+        Caches are silent by default; listeners are only called when
+        registered, so evictions cost nothing when nobody listens
+
+        Args:
+            listener: callable taking an EvictionEvent
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Unregister an eviction listener
+
+        Args:
+            listener: callable previously passed to add_listener
+        """
+        self.listeners.remove(listener)
+
+    def add_sampler(self, sampler):
+        """ Feed every looked up key to a sampler, see mrc_sampler
+
+        Args:
+            sampler: object with a record(key) method
+        """
+        self.samplers.append(sampler)
+
+    def remove_sampler(self, sampler):
+        """ Stop feeding a sampler
+
+        Args:
+            sampler: object previously passed to add_sampler
+        """
+        self.samplers.remove(sampler)
+
+    def _full_reason(self, weight):
+        """ Check whether a new entry requires an eviction first
+
+        Args:
+            weight: weight of the entry about to be added
+
+        Returns:
+            EVICTED_CAPACITY or EVICTED_WEIGHT for the limit that would
+            be exceeded, None if the entry fits
+        """
+        if self.max_items is not None and \
+                len(self.cache_data) >= self.max_items:
+            return EVICTED_CAPACITY
+        if self.max_weight is not None and \
+                self.current_weight + weight > self.max_weight:
+            return EVICTED_WEIGHT
+        return None
+
+    def _capacity(self):
+        """ Get the item capacity the policies size their regions with
+
+        Returns:
+            max_items, or the current number of items (at least 1) when
+            only the weight is bounded
+        """
+        if self.max_items is not None:
+            return self.max_items
+        return max(len(self.cache_data), 1)
+
+    def _remove(self, key):
+        """ Remove a key and its policy metadata
+
+        Args:
+            key: key currently stored in the cache
+
+        Returns:
+            the value that was stored
+        """
+        item = self.cache_data.pop(key)
+        self.current_weight -= self._weights.pop(key, 0)
+        if self.tag_index is not None:
+            self.tag_index.discard(key)
+        if self.prefix_index is not None:
+            self.prefix_index.discard(key)
+        if self.refresher is not None:
+            self.refresher.forget(key)
+        self._expiry.cancel(key)
+        self._on_remove(key)
+        return item
+
+    def _evict(self, key, reason, chosen=True):
+        """ Remove a key the cache gave up and notify the listeners
+
+        Args:
+            key: key currently stored in the cache
+            reason: one of the EVICTED_* constants
+            chosen: whether the policy picked the key as its victim
+        """
+        if chosen:
+            self._on_evict(key)
+        item = self._remove(key)
+        if self.stats is not None:
+            self.stats.record_eviction(reason)
+        if self.listeners:
+            event = EvictionEvent(reason, key, item, type(self).__name__)
+            for listener in self.listeners:
+                listener(event)
+
+    def _before_insert(self, key):
+        """ Hook called before making room for a key that is not stored
+        """
+
+    def _on_insert(self, key):
+        """ Hook called after a new key was stored
+        """
+
+    def _on_update(self, key):
+        """ Hook called after the value of a stored key was replaced
+        """
+
+    def _on_access(self, key):
+        """ Hook called when a stored key is read
+        """
+
+    def _on_evict(self, key):
+        """ Hook called right before the policy's victim is removed
+        """
+
+    def _on_remove(self, key):
+        """ Hook called after a key left the cache for any reason
+        """
+
+    def _pick_victim(self):
+        """ Choose the key to discard when the cache is full
         """
-        raise NotImplementedError("get must be implemented in your cache class")
\ No newline at end of file
+        raise NotImplementedError(
+            "_pick_victim must be implemented in your cache class")
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Cache Benchmark Module
+Replays key traces through the caching policies and compares them
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from policies import POLICIES, get_policy
+
+# BASIC never evicts, its hit ratio does not depend on the capacity
+DEFAULT_POLICIES = [name for name in POLICIES if name != "BASIC"]
+
+
+def zipf_trace(length, keys, alpha=1.0, seed=0):
+    """
+    Generate keys drawn from a Zipf distribution
+
+    Args:
+        length: Number of accesses
+        keys: Number of distinct keys
+        alpha: Skew, higher values concentrate accesses on fewer keys
+        seed: Seed of the random generator
+
+    Returns:
+        List of integer keys, 0 being the most popular
+    """
+    weights = [1 / (rank ** alpha) for rank in range(1, keys + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    generator = random.Random(seed)
+    return generator.choices(range(keys), cum_weights=cumulative, k=length)
+
+
+def scan_trace(length, keys, alpha=1.0, seed=0, scan_every=1000,
+               scan_length=None):
+    """
+    Generate a Zipf trace interrupted by sequential scans of cold keys
+
+    Scans touch keys outside the Zipf range and never repeat them, the
+    pattern that flushes a plain LRU cache
+
+    Args:
+        length: Number of accesses
+        keys: Number of distinct Zipf keys
+        alpha: Skew of the Zipf part
+        seed: Seed of the random generator
+        scan_every: Zipf accesses between two scans
+        scan_length: Keys per scan, defaults to a tenth of keys
+
+    Returns:
+        List of integer keys
+    """
+    scan_length = scan_length or max(keys // 10, 1)
+    zipf = iter(zipf_trace(length, keys, alpha, seed))
+    cold = itertools.count(keys)
+    trace = []
+    while len(trace) < length:
+        trace.extend(itertools.islice(zipf, scan_every))
+        trace.extend(itertools.islice(cold, scan_length))
+    return trace[:length]
+
+
+def loop_trace(length, keys):
+    """
+    Generate keys cycling over the same sequence
+
+    A loop slightly longer than the cache makes LRU and FIFO miss on
+    every access while MRU and LFU keep most of it
+
+    Args:
+        length: Number of accesses
+        keys: Length of the loop
+
+    Returns:
+        List of integer keys
+    """
+    return list(itertools.islice(itertools.cycle(range(keys)), length))
+
+
+def file_trace(path):
+    """
+    Read a recorded trace, one key per line
+
+    Blank lines and lines starting with # are skipped
+
+    Args:
+        path: Trace file
+
+    Returns:
+        List of string keys
+    """
+    with open(path) as trace_file:
+        return [line.strip() for line in trace_file
+                if line.strip() and not line.startswith("#")]
+
+
+def replay(cache, trace):
+    """
+    Run a trace as a read-through workload: get, and put on a miss
+
+    Args:
+        cache: BaseCaching instance
+        trace: Sequence of keys
+
+    Returns:
+        Number of hits
+    """
+    hits = 0
+    get = cache.get
+    put = cache.put
+    for key in trace:
+        if get(key) is None:
+            put(key, key)
+        else:
+            hits += 1
+    return hits
+
+
+def run(policy, capacity, trace, memory=True):
+    """
+    Measure one policy at one capacity
+
+    The timed pass runs without tracemalloc, which slows allocations
+    down, and peak memory is taken from a second identical pass
+
+    Args:
+        policy: Policy name or cache class
+        capacity: max_items of the cache
+        trace: Sequence of keys
+        memory: Whether to measure peak memory
+
+    Returns:
+        Dictionary of the results
+    """
+    cache_class = get_policy(policy)
+    cache = cache_class(max_items=capacity)
+    start = time.perf_counter()
+    hits = replay(cache, trace)
+    elapsed = time.perf_counter() - start
+    result = {
+        "policy": cache_class.__name__,
+        "capacity": capacity,
+        "accesses": len(trace),
+        "hits": hits,
+        "hit_ratio": hits / len(trace) if trace else 0.0,
+        "ops_per_sec": len(trace) / elapsed if elapsed else 0.0,
+        "peak_memory": None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            replay(cache_class(max_items=capacity), trace)
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def benchmark(trace, policies=None, capacities=(100, 1000), memory=True):
+    """
+    Measure every policy at every capacity on the same trace
+
+    Args:
+        trace: Sequence of keys
+        policies: Policy names, defaults to every evicting policy
+        capacities: max_items values to try
+        memory: Whether to measure peak memory
+
+    Returns:
+        List of result dictionaries, see run()
+    """
+    if policies is None:
+        policies = DEFAULT_POLICIES
+    return [run(policy, capacity, trace, memory)
+            for capacity in capacities for policy in policies]
+
+
+def format_table(results):
+    """
+    Lay the results out as a text table
+
+    Args:
+        results: List returned by benchmark()
+
+    Returns:
+        The table as a string
+    """
+    lines = ["{:<14} {:>9} {:>9} {:>12} {:>12}".format(
+        "policy", "capacity", "hit ratio", "ops/s", "peak KiB")]
+    for result in results:
+        peak = result["peak_memory"]
+        lines.append("{:<14} {:>9} {:>9.2%} {:>12,.0f} {:>12}".format(
+            result["policy"], result["capacity"], result["hit_ratio"],
+            result["ops_per_sec"],
+            "-" if peak is None else "{:,.0f}".format(peak / 1024)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point
+
+    Args:
+        argv: Arguments, defaults to sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("trace", choices=("zipf", "scan", "loop", "file"),
+                        help="synthetic trace to generate, or file")
+    parser.add_argument("--path", help="trace file, one key per line")
+    parser.add_argument("--length", type=int, default=100000,
+                        help="accesses in a synthetic trace")
+    parser.add_argument("--keys", type=int, default=10000,
+                        help="distinct keys, or loop length")
+    parser.add_argument("--alpha", type=float, default=1.0,
+                        help="Zipf skew")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policies", default=",".join(DEFAULT_POLICIES),
+                        help="comma separated policy names")
+    parser.add_argument("--capacities", default="100,1000",
+                        help="comma separated capacities")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the peak memory pass")
+    parser.add_argument("--json", action="store_true",
+                        help="print machine readable results")
+    args = parser.parse_args(argv)
+
+    if args.trace == "file":
+        if not args.path:
+            parser.error("the file trace needs --path")
+        trace = file_trace(args.path)
+    elif args.trace == "zipf":
+        trace = zipf_trace(args.length, args.keys, args.alpha, args.seed)
+    elif args.trace == "scan":
+        trace = scan_trace(args.length, args.keys, args.alpha, args.seed)
+    else:
+        trace = loop_trace(args.length, args.keys)
+    policies = [name.strip() for name in args.policies.split(",")]
+    capacities = [int(size) for size in args.capacities.split(",")]
+    try:
+        results = benchmark(trace, policies, capacities, not args.no_memory)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.json:
+        json.dump({
+            "trace": {
+                "kind": args.trace,
+                "path": args.path,
+                "length": len(trace),
+                "keys": args.keys,
+                "alpha": args.alpha,
+                "seed": args.seed,
+            },
+            "python": platform.python_version(),
+            "timestamp": time.time(),
+            "results": results,
+        }, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Cache Stats Module
+Opt-in counters and sampled latency histograms for the caches
+"""
+
+from time import perf_counter_ns
+
+
+class LatencyHistogram():
+    """
+    LatencyHistogram counts durations in power-of-two nanosecond buckets
+
+    Bucket i holds durations d with d.bit_length() == i, so recording is
+    a single increment and percentiles are reported as bucket bounds
+    """
+
+    def __init__(self):
+        """Initialize an empty histogram"""
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, duration):
+        """
+        Record one duration
+
+        Args:
+            duration: Duration in nanoseconds
+        """
+        self.buckets[min(duration.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram to this one
+
+        Args:
+            other: LatencyHistogram to merge in
+        """
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile of the recorded durations
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            Upper bound in nanoseconds of the bucket holding the
+            percentile, 0 when nothing was recorded
+        """
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min((1 << index) - 1, self.max)
+        return self.max
+
+    def snapshot(self):
+        """Return the histogram summary as a dictionary, in nanoseconds"""
+        return {
+            "samples": self.count,
+            "mean": self.total // self.count if self.count else 0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class CacheStats():
+    """
+    CacheStats records what a cache does once stats are enabled on it
+
+    Hits, misses, insertions, updates and evictions by reason are always
+    counted; get and put latencies are only timed for one call out of
+    sample_every to keep the clock reads off most operations
+    """
+
+    def __init__(self, sample_every=64):
+        """
+        Initialize the counters
+
+        Args:
+            sample_every: Time one get or put out of this many
+        """
+        self.sample_every = max(1, sample_every)
+        self.reset()
+
+    def reset(self):
+        """Set every counter and histogram back to zero"""
+        self.hits = 0
+        self.misses = 0
+        self.insertions = 0
+        self.updates = 0
+        self.evictions = {}
+        self.get_latency = LatencyHistogram()
+        self.put_latency = LatencyHistogram()
+        self._gets = 0
+        self._puts = 0
+
+    def record_get(self, lookup, key):
+        """
+        Run a lookup, counting it as a hit or a miss
+
+        Args:
+            lookup: callable(key) returning the value or None
+            key: Key being read
+
+        Returns:
+            The result of the lookup
+        """
+        self._gets += 1
+        if self._gets % self.sample_every:
+            item = lookup(key)
+        else:
+            start = perf_counter_ns()
+            item = lookup(key)
+            self.get_latency.add(perf_counter_ns() - start)
+        if item is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return item
+
+    def record_lookups(self, hits, misses):
+        """
+        Count lookups made in a batch, which are not timed
+
+        Args:
+            hits: Number of keys found
+            misses: Number of keys missing
+        """
+        self.hits += hits
+        self.misses += misses
+
+    def record_put(self, store, cache_data, key, item, ttl):
+        """
+        Run a store, counting it as an insertion or an update
+
+        Args:
+            store: callable(key, item, ttl) storing the item
+            cache_data: Dictionary of the cache, to see if the key is new
+            key: Key being written
+            item: Value being written
+            ttl: TTL passed along to store
+        """
+        existed = key in cache_data
+        self._puts += 1
+        if self._puts % self.sample_every:
+            store(key, item, ttl)
+        else:
+            start = perf_counter_ns()
+            store(key, item, ttl)
+            self.put_latency.add(perf_counter_ns() - start)
+        if existed:
+            self.updates += 1
+        elif key in cache_data:
+            self.insertions += 1
+
+    def record_eviction(self, reason):
+        """
+        Count an eviction
+
+        Args:
+            reason: One of the EVICTED_* constants of base_caching
+        """
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+
+    def merge(self, other):
+        """
+        Add the counters of another CacheStats to this one
+
+        Args:
+            other: CacheStats to merge in
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        self.insertions += other.insertions
+        self.updates += other.updates
+        for reason, count in other.evictions.items():
+            self.evictions[reason] = self.evictions.get(reason, 0) + count
+        self.get_latency.merge(other.get_latency)
+        self.put_latency.merge(other.put_latency)
+
+    def snapshot(self):
+        """Return the counters as a dictionary"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "insertions": self.insertions,
+            "updates": self.updates,
+            "evictions": dict(self.evictions),
+            "get_latency_ns": self.get_latency.snapshot(),
+            "put_latency_ns": self.put_latency.snapshot(),
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Count-Min Sketch Module
+Approximate, aging frequency counters in a fixed amount of memory
+"""
+
+MAX_COUNT = 15  # Counters saturate like 4-bit counters
+HALVE = bytes(value >> 1 for value in range(256))
+SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+         0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+         0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53)
+MASK_64 = (1 << 64) - 1
+
+
+class CountMinSketch():
+    """
+    CountMinSketch estimates how often keys were seen
+
+    Every key maps to one counter per row and its estimate is the
+    smallest of them, so collisions can only overestimate. Counters are
+    bytes capped at MAX_COUNT and are all halved once sample_size
+    increments have been recorded, which lets old popularity fade
+    """
+
+    def __init__(self, width=1024, depth=4, sample_size=None):
+        """
+        Initialize the sketch
+
+        Args:
+            width: Counters per row, rounded up to a power of two
+            depth: Number of rows, at most len(SEEDS)
+            sample_size: Increments between two agings, defaults to
+                ten times the width
+        """
+        if not 1 <= depth <= len(SEEDS):
+            raise ValueError("depth must be between 1 and {}".format(
+                len(SEEDS)))
+        width = 1 << max(width - 1, 1).bit_length()
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self.additions = 0
+        self.table = bytearray(width * depth)
+        self._mask = width - 1
+
+    def _indexes(self, key):
+        """Return the position of the key's counter in every row"""
+        value = hash(key) & MASK_64
+        indexes = []
+        for row in range(self.depth):
+            mixed = (value * SEEDS[row]) & MASK_64
+            mixed ^= mixed >> 32
+            indexes.append(row * self.width + (mixed & self._mask))
+        return indexes
+
+    def increment(self, key):
+        """
+        Record one occurrence of a key
+
+        Only the counters holding the current minimum are raised
+        (conservative update), which keeps overestimation low
+
+        Args:
+            key: Key that was seen
+        """
+        table = self.table
+        indexes = self._indexes(key)
+        current = min(table[index] for index in indexes)
+        if current >= MAX_COUNT:
+            return
+        for index in indexes:
+            if table[index] == current:
+                table[index] = current + 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def estimate(self, key):
+        """
+        Estimate how many times a key was seen since the last agings
+
+        Args:
+            key: Key to look up
+
+        Returns:
+            The estimated count, never lower than the true one
+        """
+        table = self.table
+        return min(table[index] for index in self._indexes(key))
+
+    def age(self):
+        """Halve every counter so recent activity outweighs old one"""
+        self.table = bytearray(self.table.translate(HALVE))
+        self.additions //= 2
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Eviction Log Module
+Asynchronous, batched sink for cache eviction events
+"""
+
+import queue
+import sys
+import threading
+
+_STOP = object()
+
+
+class BatchedEvictionLog():
+    """
+    BatchedEvictionLog is an eviction listener that writes in the background
+
+    Calling it only enqueues the event. A daemon thread collects events
+    into batches and writes each batch with a single write and flush, so
+    the thread doing the put never blocks on the stream
+    """
+
+    def __init__(self, stream=None, batch_size=256, flush_interval=0.5,
+                 line_format="DISCARD: {key}"):
+        """
+        Initialize the log and start its writer thread
+
+        Args:
+            stream: File-like object to write to, defaults to sys.stdout
+            batch_size: Maximum number of events written at once
+            flush_interval: Seconds to wait for more events before
+                writing a partial batch
+            line_format: Format string for one event, with the fields
+                reason, key, value and policy
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.line_format = line_format
+        self._events = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def __call__(self, event):
+        """
+        Queue an eviction event
+
+        Args:
+            event: EvictionEvent sent by the cache
+        """
+        self._events.put(event)
+
+    def _run(self):
+        """Write batches of events until close is called"""
+        while True:
+            event = self._events.get()
+            if event is _STOP:
+                return
+            batch = [event]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._events.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stop = True
+                    break
+                batch.append(event)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        """Format and write one batch of events"""
+        lines = [self.line_format.format(**event._asdict())
+                 for event in batch]
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        """Write the events still queued and stop the writer thread"""
+        self._events.put(_STOP)
+        self._writer.join()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Invalidation Module
+Reverse indexes used to remove groups of related keys at once
+"""
+
+
+class TagIndex():
+    """
+    TagIndex maps each tag to the keys carrying it, and back
+
+    Removing a tag's keys then only visits those keys instead of
+    scanning the whole cache
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.by_tag = {}  # tag -> set of keys
+        self.by_key = {}  # key -> tuple of tags
+
+    def __len__(self):
+        """Return the number of tagged keys"""
+        return len(self.by_key)
+
+    def add(self, key, tags):
+        """
+        Tag a key, replacing the tags it had
+
+        Args:
+            key: Key being stored
+            tags: Iterable of hashable tags
+        """
+        self.discard(key)
+        tags = tuple(set(tags))
+        if not tags:
+            return
+        self.by_key[key] = tags
+        for tag in tags:
+            keys = self.by_tag.get(tag)
+            if keys is None:
+                keys = self.by_tag[tag] = set()
+            keys.add(key)
+
+    def discard(self, key):
+        """
+        Untag a key if it has tags
+
+        Args:
+            key: Key that left the cache or was replaced
+        """
+        for tag in self.by_key.pop(key, ()):
+            keys = self.by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self.by_tag[tag]
+
+    def keys(self, tag):
+        """
+        List the keys carrying a tag
+
+        Args:
+            tag: Tag to look up
+
+        Returns:
+            List of keys, empty if the tag is unknown
+        """
+        return list(self.by_tag.get(tag, ()))
+
+    def tags(self, key):
+        """
+        Get the tags of a key
+
+        Args:
+            key: Key to look up
+
+        Returns:
+            Tuple of tags, empty if the key has none
+        """
+        return self.by_key.get(key, ())
+
+
+class PrefixTrie():
+    """
+    PrefixTrie indexes str keys character by character
+
+    Each node is a dict of child nodes, and a node ending a key also
+    holds the key under None so matches are collected without joining
+    characters back together. Finding the keys under a prefix costs the
+    length of the prefix plus the size of the subtree below it. Nodes
+    are pruned as soon as they lead to no key
+    """
+
+    def __init__(self, keys=()):
+        """
+        Initialize the trie
+
+        Args:
+            keys: Keys to index, those that are not str are skipped
+        """
+        self.root = {}
+        self.size = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        """Return the number of indexed keys"""
+        return self.size
+
+    def add(self, key):
+        """
+        Index a key, keys that are not str are ignored
+
+        Args:
+            key: Key being stored
+        """
+        if not isinstance(key, str):
+            return
+        node = self.root
+        for char in key:
+            child = node.get(char)
+            if child is None:
+                child = node[char] = {}
+            node = child
+        if None not in node:
+            node[None] = key
+            self.size += 1
+
+    def discard(self, key):
+        """
+        Remove a key from the index if it is there
+
+        Args:
+            key: Key that left the cache
+        """
+        if not isinstance(key, str):
+            return
+        path = []
+        node = self.root
+        for char in key:
+            child = node.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+        if node.pop(None, None) is None:
+            return
+        self.size -= 1
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def keys(self, prefix):
+        """
+        List the indexed keys starting with a prefix
+
+        Args:
+            prefix: str prefix, "" matches every key
+
+        Returns:
+            List of matching keys
+        """
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    found.append(child)
+                else:
+                    stack.append(child)
+        return found
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Memcache Client Module
+Pooled asyncio client for the memcached text protocol
+"""
+
+import asyncio
+import re
+
+MAX_KEY_LENGTH = 250
+BAD_KEY = re.compile(rb"[\x00-\x20\x7f]")  # Whitespace and control bytes
+
+
+class MemcacheError(Exception):
+    """
+    Raised when the server answers with an error or a key is invalid
+    """
+
+
+class ProtocolError(MemcacheError):
+    """
+    Raised when a response cannot be parsed or the server rejects a
+    request as malformed, after which it may close the connection; the
+    connection is dropped
+    """
+
+
+def _key_bytes(key):
+    """
+    Encode a str key, bytes keys are used as they are
+
+    Args:
+        key: str or bytes key
+
+    Returns:
+        The key as bytes
+
+    Raises:
+        MemcacheError: if the key is empty, longer than MAX_KEY_LENGTH
+            or holds whitespace or control characters, which would let
+            it inject commands
+    """
+    key = key.encode() if isinstance(key, str) else bytes(key)
+    if not 0 < len(key) <= MAX_KEY_LENGTH or BAD_KEY.search(key):
+        raise MemcacheError("invalid key {!r}".format(key))
+    return key
+
+
+class _Connection():
+    """
+    One open connection of the pool
+    """
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader, writer):
+        """
+        Initialize a connection
+
+        Args:
+            reader: asyncio StreamReader
+            writer: asyncio StreamWriter
+        """
+        self.reader = reader
+        self.writer = writer
+
+    async def call(self, request, read_response):
+        """
+        Send a request and parse its response
+
+        Args:
+            request: Bytes of the whole request
+            read_response: Coroutine function parsing from a reader
+
+        Returns:
+            Whatever read_response returns
+        """
+        self.writer.write(request)
+        await self.writer.drain()
+        return await read_response(self.reader)
+
+    def close(self):
+        """Close the socket"""
+        self.writer.close()
+
+
+async def _read_line(reader):
+    """Read one response line, raising MemcacheError on error lines"""
+    line = await reader.readuntil(b"\r\n")
+    if line.startswith(b"CLIENT_ERROR"):
+        raise ProtocolError(line.strip().decode(errors="replace"))
+    if line.startswith((b"ERROR", b"SERVER_ERROR")):
+        raise MemcacheError(line.strip().decode(errors="replace"))
+    return line[:-2]
+
+
+async def _read_values(reader):
+    """
+    Read the VALUE blocks of a get or gets response
+
+    Returns:
+        Dictionary of key -> (value, flags, cas unique or None)
+    """
+    values = {}
+    while True:
+        line = await _read_line(reader)
+        if line == b"END":
+            return values
+        parts = line.split()
+        try:
+            if parts[0] != b"VALUE" or len(parts) not in (4, 5):
+                raise ValueError
+            flags, length = int(parts[2]), int(parts[3])
+            unique = int(parts[4]) if len(parts) == 5 else None
+        except (IndexError, ValueError):
+            raise ProtocolError("unexpected response {!r}".format(line))
+        data = await reader.readexactly(length + 2)
+        values[parts[1]] = (data[:-2], flags, unique)
+
+
+class MemcacheClient():
+    """
+    MemcacheClient talks to MemcacheServer or any memcached server
+
+    Up to pool_size connections are opened on demand and reused; a
+    request borrows one for its whole round trip, so concurrent
+    coroutines run their requests on different connections. A
+    connection that fails mid-request is closed rather than returned,
+    since its stream may hold half a response
+    """
+
+    def __init__(self, host="127.0.0.1", port=11211, path=None,
+                 pool_size=4):
+        """
+        Initialize the client, no connection is opened yet
+
+        Args:
+            host: Server address for TCP
+            port: Server TCP port
+            path: Unix socket path, used instead of TCP when given
+            pool_size: Maximum number of open connections
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.pool_size = pool_size
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._available = asyncio.Condition()
+
+    async def _connect(self):
+        """Open a new connection"""
+        if self.path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host,
+                                                           self.port)
+        return _Connection(reader, writer)
+
+    async def _acquire(self):
+        """Borrow an idle connection, opening one if the pool has room"""
+        async with self._available:
+            while not self._idle and self._open >= self.pool_size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return await self._connect()
+        except BaseException:
+            async with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+    async def _release(self, connection, healthy):
+        """Give a connection back, or drop it after a failure"""
+        async with self._available:
+            if healthy and not self._closed:
+                self._idle.append(connection)
+            else:
+                connection.close()
+                self._open -= 1
+            self._available.notify()
+
+    async def _call(self, request, read_response):
+        """Run one request on a pooled connection"""
+        connection = await self._acquire()
+        healthy = False
+        try:
+            response = await connection.call(request, read_response)
+            healthy = True
+            return response
+        except ProtocolError:
+            raise  # The stream is out of sync, the connection is dropped
+        except MemcacheError:
+            healthy = True  # The response was read whole
+            raise
+        finally:
+            await self._release(connection, healthy)
+
+    async def get(self, key):
+        """
+        Retrieve a value
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            The value as bytes, or None if not found
+        """
+        key = _key_bytes(key)
+        values = await self._call(b"get %s\r\n" % key, _read_values)
+        found = values.get(key)
+        return found[0] if found is not None else None
+
+    async def get_many(self, keys):
+        """
+        Retrieve several values in one request
+
+        Args:
+            keys: Iterable of str or bytes keys
+
+        Returns:
+            Dictionary of the keys that were found, as bytes, and their
+            values
+        """
+        keys = [_key_bytes(key) for key in keys]
+        if not keys:
+            return {}
+        values = await self._call(b"get %s\r\n" % b" ".join(keys),
+                                  _read_values)
+        return {key: found[0] for key, found in values.items()}
+
+    async def gets(self, key):
+        """
+        Retrieve a value with its cas unique
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            Tuple (value, cas unique), or None if not found
+        """
+        key = _key_bytes(key)
+        values = await self._call(b"gets %s\r\n" % key, _read_values)
+        found = values.get(key)
+        return (found[0], found[2]) if found is not None else None
+
+    async def _store(self, command, key, value, exptime, flags,
+                     unique=None):
+        """Send a storage command and return the response line"""
+        if isinstance(value, str):
+            value = value.encode()
+        line = b"%s %s %d %d %d" % (command, _key_bytes(key), flags,
+                                    exptime, len(value))
+        if unique is not None:
+            line += b" %d" % unique
+        return await self._call(line + b"\r\n" + value + b"\r\n",
+                                _read_line)
+
+    async def set(self, key, value, exptime=0, flags=0):
+        """
+        Store a value
+
+        Args:
+            key: str or bytes key
+            value: str or bytes value
+            exptime: Seconds to live, 0 for no expiry
+            flags: Opaque 32-bit integer kept with the value
+
+        Returns:
+            True if stored
+        """
+        response = await self._store(b"set", key, value, exptime, flags)
+        return response == b"STORED"
+
+    async def cas(self, key, value, unique, exptime=0, flags=0):
+        """
+        Store a value only if it did not change since gets
+
+        Args:
+            key: str or bytes key
+            value: str or bytes value
+            unique: cas unique returned by gets
+            exptime: Seconds to live, 0 for no expiry
+            flags: Opaque 32-bit integer kept with the value
+
+        Returns:
+            True if stored, False if the key changed or disappeared
+        """
+        response = await self._store(b"cas", key, value, exptime, flags,
+                                     unique)
+        return response == b"STORED"
+
+    async def delete(self, key):
+        """
+        Remove a key
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        response = await self._call(b"delete %s\r\n" % _key_bytes(key),
+                                    _read_line)
+        return response == b"DELETED"
+
+    async def close(self):
+        """Close the idle connections, borrowed ones close on return"""
+        async with self._available:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._open -= len(self._idle)
+            self._idle = []
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Memcache Server Module
+Serves any caching policy over the memcached text protocol
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import time
+from policies import get_policy
+
+VERSION = b"1.6.0-caching"
+MAX_KEY_LENGTH = 250
+MAX_LINE_LENGTH = 4096  # Longest command line buffered before a newline
+RELATIVE_LIMIT = 60 * 60 * 24 * 30  # Larger exptimes are unix timestamps
+STORAGE_COMMANDS = (b"set", b"add", b"replace", b"cas")
+
+
+def entry_weight(key, item):
+    """
+    Weigh a stored entry by the bytes it holds
+
+    Args:
+        key: bytes key
+        item: Tuple (flags, cas unique, data)
+
+    Returns:
+        Length of the key and the data plus a fixed overhead
+    """
+    return len(key) + len(item[2]) + 64
+
+
+class _MemcacheProtocol(asyncio.Protocol):
+    """
+    One client connection
+
+    Commands are parsed straight from the receive buffer, and the
+    responses to every complete command of a read are sent in one write,
+    so pipelined requests cost one system call per batch. Reading stops
+    while the client does not consume its responses. The data block of a
+    rejected storage command is dropped as it arrives, never buffered,
+    and the keys of a multi-get too long to buffer are answered as they
+    arrive
+    """
+
+    def __init__(self, server):
+        """
+        Initialize the connection state
+
+        Args:
+            server: MemcacheServer owning the cache
+        """
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+        self.skip = 0  # Bytes of a rejected data block still to drop
+        self.get_name = None  # get or gets, while its line is streamed
+
+    def connection_made(self, transport):
+        """Keep the transport to answer on"""
+        self.transport = transport
+
+    def pause_writing(self):
+        """Stop reading commands until the responses are flushed"""
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        """Read commands again"""
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        """
+        Run every complete command received so far
+
+        Args:
+            data: Bytes read from the socket
+        """
+        if self.skip:
+            dropped = min(self.skip, len(data))
+            self.skip -= dropped
+            data = data[dropped:]
+        buffer = self.buffer
+        buffer += data
+        out = []
+        start = 0
+        while True:
+            end = buffer.find(b"\r\n", start)
+            if end < 0:
+                if len(buffer) - start > MAX_LINE_LENGTH:
+                    consumed = self._partial_get(buffer, start, out)
+                    if consumed is None:
+                        out.append(b"CLIENT_ERROR line too long\r\n")
+                        self._close(out)
+                        return
+                    start = consumed
+                break
+            line = bytes(buffer[start:end])
+            parts = line.split()
+            if self.get_name is not None:
+                # The last keys of a streamed multi-get
+                self.server.get_values(parts, self.get_name == b"gets",
+                                       out)
+                out.append(b"END\r\n")
+                self.get_name = None
+                start = end + 2
+            elif parts and parts[0] in STORAGE_COMMANDS:
+                consumed = self.server.store_command(
+                    parts, buffer, end + 2, out)
+                if consumed is None:
+                    break  # Data block not fully received yet
+                start = consumed
+            else:
+                start = end + 2
+                if not self.server.command(parts, out):
+                    self._close(out)
+                    return
+        if start > len(buffer):
+            self.skip = start - len(buffer)
+            start = len(buffer)
+        del buffer[:start]
+        if out:
+            self.transport.write(b"".join(out))
+
+    def _partial_get(self, buffer, start, out):
+        """
+        Answer the complete keys of a get line still being received
+
+        Args:
+            buffer: Receive buffer holding the start of the line
+            start: Offset of the line, or of its unanswered keys
+            out: List the responses are appended to
+
+        Returns:
+            Offset of the first key not answered yet, None if the line
+            is not a get or has no complete key
+        """
+        cut = buffer.rfind(b" ", start)
+        if cut <= start:
+            return None
+        parts = bytes(buffer[start:cut]).split()
+        if self.get_name is None:
+            if not parts or parts[0] not in (b"get", b"gets"):
+                return None
+            self.get_name = parts.pop(0)
+        self.server.get_values(parts, self.get_name == b"gets", out)
+        return cut + 1
+
+    def _close(self, out):
+        """Send the last responses and close the connection"""
+        if out:
+            self.transport.write(b"".join(out))
+        self.transport.close()
+
+
+class MemcacheServer():
+    """
+    MemcacheServer exposes a BaseCaching policy to memcached clients
+
+    It speaks the text protocol (get, gets, set, add, replace, cas,
+    delete, flush_all, version, quit) over TCP or a Unix socket. The
+    cache lives on the event loop thread, so it needs no lock. Values
+    are stored as (flags, cas unique, data) under bytes keys
+    """
+
+    def __init__(self, cache=None, policy="LRU", max_value_size=1 << 20,
+                 **kwargs):
+        """
+        Initialize the server
+
+        Args:
+            cache: BaseCaching instance to serve, built from policy and
+                kwargs when None
+            policy: Policy name or cache class used when cache is None
+            max_value_size: Largest value accepted, in bytes
+            kwargs: Options for the policy, such as max_items; with a
+                max_weight, entries are weighed by entry_weight unless
+                a weigher is given
+        """
+        if cache is None:
+            if "max_weight" in kwargs:
+                kwargs.setdefault("weigher", entry_weight)
+            cache = get_policy(policy)(**kwargs)
+        self.cache = cache
+        self.max_value_size = max_value_size
+        self._cas = itertools.count(1)
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=11211, path=None):
+        """
+        Start listening
+
+        Args:
+            host: Address to bind for TCP
+            port: TCP port
+            path: Unix socket path, used instead of TCP when given
+
+        Returns:
+            The asyncio Server
+        """
+        loop = asyncio.get_running_loop()
+        factory = functools.partial(_MemcacheProtocol, self)
+        if path is not None:
+            self._server = await loop.create_unix_server(factory, path)
+        else:
+            self._server = await loop.create_server(factory, host, port)
+        return self._server
+
+    async def close(self):
+        """Stop listening and wait for the server to shut down"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _ttl(self, exptime):
+        """
+        Convert a memcached exptime to a TTL
+
+        Returns:
+            Seconds to live, None for no expiry, or a value <= 0 when
+            the item is already expired
+        """
+        if exptime == 0:
+            return None
+        if exptime > RELATIVE_LIMIT:
+            return exptime - time.time()
+        return exptime
+
+    def command(self, parts, out):
+        """
+        Run a command that has no data block
+
+        Args:
+            parts: Command line split on whitespace
+            out: List the responses are appended to
+
+        Returns:
+            False if the connection must be closed, True otherwise
+        """
+        if not parts:
+            out.append(b"ERROR\r\n")
+            return True
+        name = parts[0]
+        if name == b"get" or name == b"gets":
+            if len(parts) < 2:
+                out.append(b"ERROR\r\n")
+                return True
+            self.get_values(parts[1:], name == b"gets", out)
+            out.append(b"END\r\n")
+        elif name == b"delete":
+            noreply = parts[-1] == b"noreply"
+            if len(parts) < 2:
+                out.append(b"ERROR\r\n")
+                return True
+            deleted = self.cache.delete(parts[1])
+            if not noreply:
+                out.append(b"DELETED\r\n" if deleted else b"NOT_FOUND\r\n")
+        elif name == b"flush_all":
+            self.cache.clear()
+            if parts[-1] != b"noreply":
+                out.append(b"OK\r\n")
+        elif name == b"version":
+            out.append(b"VERSION %s\r\n" % VERSION)
+        elif name == b"quit":
+            return False
+        else:
+            out.append(b"ERROR\r\n")
+        return True
+
+    def get_values(self, keys, with_cas, out):
+        """
+        Append the VALUE blocks of the keys that are cached
+
+        Args:
+            keys: bytes keys to look up
+            with_cas: Whether to include the cas unique, for gets
+            out: List the responses are appended to
+        """
+        get = self.cache.get
+        for key in keys:
+            item = get(key)
+            if item is None:
+                continue
+            flags, unique, data = item
+            if with_cas:
+                out.append(b"VALUE %s %d %d %d\r\n" % (
+                    key, flags, len(data), unique))
+            else:
+                out.append(b"VALUE %s %d %d\r\n" % (
+                    key, flags, len(data)))
+            out.append(data)
+            out.append(b"\r\n")
+
+    def store_command(self, parts, buffer, data_start, out):
+        """
+        Run set, add, replace or cas once its data block is complete
+
+        Args:
+            parts: Command line split on whitespace
+            buffer: Receive buffer holding the data block
+            data_start: Offset of the data block in buffer
+            out: List the responses are appended to
+
+        Returns:
+            Offset after the data block, or None if it is incomplete;
+            for a rejected block the offset may lie past the buffer,
+            the rest is dropped as it arrives
+        """
+        name = parts[0]
+        expected = 6 if name == b"cas" else 5
+        noreply = len(parts) == expected + 1 and parts[-1] == b"noreply"
+        try:
+            if len(parts) != expected + noreply:
+                raise ValueError
+            key = parts[1]
+            flags, exptime, length = (int(part) for part in parts[2:5])
+            unique = int(parts[5]) if name == b"cas" else None
+            if length < 0 or not 0 <= flags < 1 << 32:
+                raise ValueError
+        except ValueError:
+            out.append(b"CLIENT_ERROR bad command line format\r\n")
+            return data_start
+        end = data_start + length
+        # Checked before the block arrives, so it is never buffered
+        if len(key) > MAX_KEY_LENGTH:
+            out.append(b"CLIENT_ERROR key too long\r\n")
+            return end + 2
+        if length > self.max_value_size:
+            self.cache.delete(key)
+            out.append(b"SERVER_ERROR object too large for cache\r\n")
+            return end + 2
+        if len(buffer) < end + 2:
+            return None
+        if buffer[end:end + 2] != b"\r\n":
+            out.append(b"CLIENT_ERROR bad data chunk\r\n")
+            return end + 2
+
+        current = self.cache.get(key)
+        if name == b"add" and current is not None or \
+                name == b"replace" and current is None:
+            response = b"NOT_STORED\r\n"
+        elif name == b"cas" and current is None:
+            response = b"NOT_FOUND\r\n"
+        elif name == b"cas" and current[1] != unique:
+            response = b"EXISTS\r\n"
+        else:
+            response = b"STORED\r\n"
+            ttl = self._ttl(exptime)
+            if ttl is not None and ttl <= 0:
+                self.cache.delete(key)
+            else:
+                data = bytes(buffer[data_start:end])
+                self.cache.put(key, (flags, next(self._cas), data), ttl)
+        if not noreply:
+            out.append(response)
+        return end + 2
+
+
+def main(argv=None):
+    """
+    Command line entry point
+
+    Args:
+        argv: Arguments, defaults to sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11211)
+    parser.add_argument("--unix", help="listen on this Unix socket")
+    parser.add_argument("--policy", default="LRU",
+                        help="caching policy, such as LRU, LFU or ARC")
+    parser.add_argument("--max-items", type=int,
+                        help="maximum number of items")
+    parser.add_argument("--max-bytes", type=int,
+                        help="maximum total size of the items")
+    args = parser.parse_args(argv)
+    if args.max_items is None and args.max_bytes is None:
+        args.max_items = 100000
+    options = {"max_items": args.max_items}
+    if args.max_bytes is not None:
+        options["max_weight"] = args.max_bytes
+
+    async def serve():
+        """Run the server until interrupted"""
+        server = MemcacheServer(policy=args.policy, **options)
+        listener = await server.start(args.host, args.port, args.unix)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Memoize Module
+Decorator caching the results of a function in one of the policies
+"""
+
+import functools
+import math
+import threading
+from policies import get_policy
+from single_flight import SingleFlight
+
+_KWARGS_MARK = object()  # Separates positional from keyword arguments
+_NONE = object()  # Stored in place of None results, which caches reject
+
+
+class _HashedKey(list):
+    """
+    Argument list that computes its hash only once, since the cache
+    looks the same key up in several dictionaries
+    """
+    __slots__ = ("hash_value",)
+
+    def __init__(self, items):
+        """
+        Build the key, TypeError is raised if items is unhashable
+
+        Args:
+            items: Tuple describing the call
+        """
+        super().__init__(items)
+        self.hash_value = hash(items)
+
+    def __hash__(self):
+        """Return the hash computed once at creation"""
+        return self.hash_value
+
+
+def make_key(args, kwargs, typed=False):
+    """
+    Build a cache key for a call
+
+    Keyword arguments are sorted by name so f(a=1, b=2) and f(b=2, a=1)
+    share an entry
+
+    Args:
+        args: Positional arguments of the call
+        kwargs: Keyword arguments of the call
+        typed: Whether arguments of different types get their own entry,
+            e.g. f(1) and f(1.0)
+
+    Returns:
+        A hashable key, TypeError is raised for unhashable arguments
+    """
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(arg) for arg in args)
+        if kwargs:
+            key += tuple(type(kwargs[name]) for name in sorted(kwargs))
+    if len(key) == 1 and type(key[0]) in (int, str):
+        return key[0]
+    return _HashedKey(key)
+
+
+def cached(policy="LRU", maxsize=128, ttl=None, typed=False):
+    """
+    Cache the results of a function in a bounded cache
+
+    The decorated function gains:
+      - cache: the underlying policy instance
+      - cache_info(): its stats snapshot
+      - cache_clear(): drop every cached result and reset the stats
+      - invalidate(*args, **kwargs): drop the result of one call
+
+    Calls with unhashable arguments are not cached. Concurrent calls with
+    the same arguments share a single execution on a miss
+
+    Args:
+        policy: Policy name (LRU, LFU, ARC, ...) or cache class
+        maxsize: Maximum number of cached results, None for no limit
+        ttl: Seconds a result stays valid, None to keep it until evicted
+        typed: Cache arguments of different types separately
+
+    Returns:
+        The decorator
+    """
+    cache_class = get_policy(policy)
+
+    def decorator(function):
+        """Wrap a function with its own cache"""
+        if maxsize is None:
+            # Weightless entries under an infinite budget: nothing is
+            # ever evicted, and the policies size themselves on the
+            # number of items like any cache bounded by weight only
+            cache = cache_class(max_weight=math.inf,
+                                weigher=lambda key, item: 0)
+        else:
+            cache = cache_class(max_items=maxsize)
+        cache.enable_stats()
+        lock = threading.Lock()
+        flights = SingleFlight()
+
+        def load(key, args, kwargs):
+            """Call the function unless a previous flight just stored it"""
+            with lock:
+                result = cache._get(key)
+            if result is not None:
+                return None if result is _NONE else result
+            result = function(*args, **kwargs)
+            with lock:
+                cache.put(key, _NONE if result is None else result, ttl)
+            return result
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            """Return the cached result or compute it"""
+            try:
+                key = make_key(args, kwargs, typed)
+            except TypeError:
+                return function(*args, **kwargs)
+            with lock:
+                result = cache.get(key)
+            if result is None:
+                return flights.do(key, lambda: load(key, args, kwargs))
+            return None if result is _NONE else result
+
+        def cache_info():
+            """Return the stats snapshot of the function's cache"""
+            with lock:
+                return cache.stats_snapshot()
+
+        def cache_clear():
+            """Drop every cached result and reset the stats"""
+            with lock:
+                cache.clear()
+                cache.reset_stats()
+
+        def invalidate(*args, **kwargs):
+            """Drop the cached result of one call, True if there was one"""
+            with lock:
+                return cache.delete(make_key(args, kwargs, typed))
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    """Test the cached decorator"""
+
+    @cached(policy="LFU", maxsize=2)
+    def display_name(first_name, last_name=None):
+        """Build a display name"""
+        print("computing {} {}".format(first_name, last_name))
+        return "{} {}".format(first_name, last_name or "").strip()
+
+    print(display_name("Bob"))
+    print(display_name("Bob"))
+    print(display_name("Bob", last_name="Dylan"))
+    print(display_name.invalidate("Bob"))
+    print(display_name("Bob"))
+    print(display_name.cache_info()["hits"])
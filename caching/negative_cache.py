@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Negative Cache Module
+Remembers keys known to be absent so their lookups skip the loader
+"""
+
+from collections import OrderedDict
+
+
+class NegativeCache():
+    """
+    NegativeCache is a small LRU of absent keys with a short TTL
+
+    It holds no values, only the time each absence stops being trusted,
+    and is kept apart from the cached values so a flood of lookups for
+    bogus keys (e.g. credential stuffing) can only churn its own share
+    of memory. Expired keys are dropped when they are next checked or
+    when they reach the LRU end
+    """
+
+    def __init__(self, max_items, ttl, clock):
+        """
+        Initialize the negative cache
+
+        Args:
+            max_items: Maximum number of absent keys remembered
+            ttl: Seconds an absence is trusted
+            clock: callable returning the current time in seconds
+        """
+        self.max_items = max(int(max_items), 1)
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self._deadlines = OrderedDict()  # key -> expiry, LRU first
+
+    def __len__(self):
+        """Return the number of absent keys remembered"""
+        return len(self._deadlines)
+
+    def add(self, key):
+        """
+        Remember that a key is absent
+
+        Args:
+            key: Key the loader found nothing for
+        """
+        self._deadlines[key] = self.clock() + self.ttl
+        self._deadlines.move_to_end(key)
+        if len(self._deadlines) > self.max_items:
+            self._deadlines.popitem(last=False)
+
+    def check(self, key):
+        """
+        Check whether a key is known to be absent
+
+        Args:
+            key: Key being looked up
+
+        Returns:
+            True if the key was recently found absent, False otherwise
+        """
+        deadline = self._deadlines.get(key)
+        if deadline is None:
+            return False
+        if deadline <= self.clock():
+            del self._deadlines[key]
+            return False
+        self._deadlines.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def discard(self, key):
+        """
+        Forget a key, which now exists
+
+        Args:
+            key: Key that was stored
+        """
+        self._deadlines.pop(key, None)
+
+    def clear(self):
+        """Forget every absent key"""
+        self._deadlines.clear()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Policies Module
+Registry of the caching policies so wrappers can pick one by name
+"""
+
+BasicCache = __import__('0-basic_cache').BasicCache
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+TinyLFUCache = __import__('102-tinylfu_cache').TinyLFUCache
+ClockCache = __import__('103-clock_cache').ClockCache
+ClockProCache = __import__('103-clock_cache').ClockProCache
+SLRUCache = __import__('104-slru_cache').SLRUCache
+TwoQueueCache = __import__('104-slru_cache').TwoQueueCache
+
+POLICIES = {
+    "BASIC": BasicCache,
+    "FIFO": FIFOCache,
+    "LIFO": LIFOCache,
+    "LRU": LRUCache,
+    "MRU": MRUCache,
+    "LFU": LFUCache,
+    "ARC": ARCCache,
+    "TINYLFU": TinyLFUCache,
+    "CLOCK": ClockCache,
+    "CLOCKPRO": ClockProCache,
+    "SLRU": SLRUCache,
+    "2Q": TwoQueueCache,
+}
+
+
+def get_policy(policy):
+    """
+    Resolve a policy name or class to a cache class
+
+    Args:
+        policy: Policy name such as "LRU", or a BaseCaching subclass
+
+    Returns:
+        The matching cache class
+    """
+    if isinstance(policy, str):
+        try:
+            return POLICIES[policy.upper()]
+        except KeyError:
+            raise ValueError("unknown cache policy: {}".format(policy))
+    return policy
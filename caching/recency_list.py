@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Recency List Module
+Shared ordering engine used by the caching policies to track
+insertion or access order with constant time operations
+"""
+
+from array import array
+from collections import OrderedDict
+
+_DELETED = object()  # Tombstone of a removed key in ArrayRecencyList
+
+
+class RecencyList():
+    """
+    RecencyList keeps keys ordered from oldest to newest
+
+    It is backed by an OrderedDict, which pairs a hash map with a
+    doubly linked list, so pushing, touching, removing and popping
+    from either end are all O(1) regardless of how many keys it holds
+    """
+
+    def __init__(self):
+        """Initialize an empty recency list"""
+        self._order = OrderedDict()
+
+    def __len__(self):
+        """Return the number of tracked keys"""
+        return len(self._order)
+
+    def __contains__(self, key):
+        """Check whether a key is tracked"""
+        return key in self._order
+
+    def __iter__(self):
+        """Iterate over the keys from oldest to newest"""
+        return iter(self._order)
+
+    def __getstate__(self):
+        """Pickle the keys alone, oldest first"""
+        return list(self._order)
+
+    def __setstate__(self, keys):
+        """Rebuild the order from pickled keys"""
+        self._order = OrderedDict.fromkeys(keys)
+
+    def push(self, key):
+        """
+        Add a key as the newest entry, leaving it in place if present
+
+        Args:
+            key: Key to track
+        """
+        if key not in self._order:
+            self._order[key] = None
+
+    def touch(self, key):
+        """
+        Mark a key as the newest entry, adding it if missing
+
+        Args:
+            key: Key that was just used
+        """
+        if key in self._order:
+            self._order.move_to_end(key)
+        else:
+            self._order[key] = None
+
+    def discard(self, key):
+        """
+        Stop tracking a key if it is present
+
+        Args:
+            key: Key to forget
+        """
+        self._order.pop(key, None)
+
+    def oldest(self):
+        """Return the oldest key without removing it, or None"""
+        return next(iter(self._order), None)
+
+    def newest(self):
+        """Return the newest key without removing it, or None"""
+        return next(reversed(self._order), None)
+
+    def pop_oldest(self):
+        """Remove and return the oldest key"""
+        return self._order.popitem(last=False)[0]
+
+    def pop_newest(self):
+        """Remove and return the newest key"""
+        return self._order.popitem(last=True)[0]
+
+
+class ArrayRecencyList():
+    """
+    ArrayRecencyList is a RecencyList packed into three flat arrays
+
+    Keys live in an open addressing table (linear probing) and the
+    order is a doubly linked list threaded through the same table
+    positions by two int arrays, so a key costs one list slot and two
+    4-byte links instead of an OrderedDict entry and its node. Removed
+    keys leave a tombstone until the table is rebuilt. Every operation
+    is still O(1) on average, but probing runs in Python and is several
+    times slower than the C OrderedDict
+    """
+    __slots__ = ("_keys", "_prev", "_next", "_mask", "_head", "_tail",
+                 "_size", "_filled")
+
+    def __init__(self):
+        """Initialize an empty recency list"""
+        self._allocate(8)
+
+    def _allocate(self, table_size):
+        """Start over with an empty table of a power of two size"""
+        self._keys = [None] * table_size
+        self._prev = array("i", [-1]) * table_size
+        self._next = array("i", [-1]) * table_size
+        self._mask = table_size - 1
+        self._head = -1  # Position of the oldest key
+        self._tail = -1  # Position of the newest key
+        self._size = 0
+        self._filled = 0  # Keys plus tombstones
+
+    def _probe(self, key):
+        """
+        Look a key up in the table
+
+        Returns:
+            Its position if present, otherwise -1 - the position where
+            it would be inserted
+        """
+        keys = self._keys
+        mask = self._mask
+        index = hash(key) & mask
+        free = -1
+        while True:
+            found = keys[index]
+            if found is None:
+                return -1 - (index if free < 0 else free)
+            if found is _DELETED:
+                if free < 0:
+                    free = index
+            elif found is key or found == key:
+                return index
+            index = (index + 1) & mask
+
+    def _append(self, index, key):
+        """Store a key at a free position and link it as the newest"""
+        if self._keys[index] is None:
+            self._filled += 1
+        self._keys[index] = key
+        self._size += 1
+        self._link(index)
+        if self._filled * 3 > len(self._keys) * 2:
+            self._rebuild()
+
+    def _link(self, index):
+        """Link a position at the newest end of the order"""
+        tail = self._tail
+        self._prev[index] = tail
+        self._next[index] = -1
+        if tail < 0:
+            self._head = index
+        else:
+            self._next[tail] = index
+        self._tail = index
+
+    def _unlink(self, index):
+        """Take a position out of the order, leaving its key in place"""
+        prev = self._prev[index]
+        following = self._next[index]
+        if prev < 0:
+            self._head = following
+        else:
+            self._next[prev] = following
+        if following < 0:
+            self._tail = prev
+        else:
+            self._prev[following] = prev
+
+    def _delete(self, index):
+        """Remove the key at a position, returning it"""
+        key = self._keys[index]
+        self._unlink(index)
+        self._keys[index] = _DELETED
+        self._size -= 1
+        return key
+
+    def _rebuild(self):
+        """Rehash into a table three times the size, dropping tombstones"""
+        order = list(self)
+        table_size = 8
+        while table_size < 3 * len(order):
+            table_size <<= 1
+        self._allocate(table_size)
+        for key in order:
+            self._append(-1 - self._probe(key), key)
+
+    def __len__(self):
+        """Return the number of tracked keys"""
+        return self._size
+
+    def __contains__(self, key):
+        """Check whether a key is tracked"""
+        return self._probe(key) >= 0
+
+    def __iter__(self):
+        """Iterate over the keys from oldest to newest"""
+        keys = self._keys
+        following = self._next
+        index = self._head
+        while index >= 0:
+            yield keys[index]
+            index = following[index]
+
+    def __getstate__(self):
+        """Pickle the keys alone, oldest first"""
+        return list(self)
+
+    def __setstate__(self, keys):
+        """Rebuild the table from pickled keys"""
+        self._allocate(8)
+        for key in keys:
+            self.push(key)
+
+    def __setitem__(self, key, value):
+        """
+        Push a key, so the list can stand in for an OrderedDict whose
+        values are all None
+
+        Args:
+            key: Key to track
+            value: Ignored
+        """
+        self.push(key)
+
+    def __delitem__(self, key):
+        """
+        Remove a key, raising KeyError if it is not tracked
+
+        Args:
+            key: Key to forget
+        """
+        index = self._probe(key)
+        if index < 0:
+            raise KeyError(key)
+        self._delete(index)
+
+    def push(self, key):
+        """
+        Add a key as the newest entry, leaving it in place if present
+
+        Args:
+            key: Key to track
+        """
+        index = self._probe(key)
+        if index < 0:
+            self._append(-1 - index, key)
+
+    def touch(self, key):
+        """
+        Mark a key as the newest entry, adding it if missing
+
+        Args:
+            key: Key that was just used
+        """
+        index = self._probe(key)
+        if index < 0:
+            self._append(-1 - index, key)
+        elif index != self._tail:
+            self._unlink(index)
+            self._link(index)
+
+    def discard(self, key):
+        """
+        Stop tracking a key if it is present
+
+        Args:
+            key: Key to forget
+        """
+        index = self._probe(key)
+        if index >= 0:
+            self._delete(index)
+
+    def oldest(self):
+        """Return the oldest key without removing it, or None"""
+        return self._keys[self._head] if self._head >= 0 else None
+
+    def newest(self):
+        """Return the newest key without removing it, or None"""
+        return self._keys[self._tail] if self._tail >= 0 else None
+
+    def pop_oldest(self):
+        """Remove and return the oldest key"""
+        if self._head < 0:
+            raise KeyError("recency list is empty")
+        return self._delete(self._head)
+
+    def pop_newest(self):
+        """Remove and return the newest key"""
+        if self._tail < 0:
+            raise KeyError("recency list is empty")
+        return self._delete(self._tail)
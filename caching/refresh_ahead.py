@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Refresh Ahead Module
+Reloads entries in the background once their soft TTL has passed
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _SoftEntry():
+    """
+    How and when to reload one key
+    """
+    __slots__ = ("deadline", "loader", "ttl", "soft_ttl", "refreshing")
+
+    def __init__(self, deadline, loader, ttl, soft_ttl):
+        """
+        Initialize a soft entry
+
+        Args:
+            deadline: Time after which the value is stale, cache clock
+            loader: callable(key) returning a fresh value
+            ttl: Hard TTL given to reloaded values
+            soft_ttl: Seconds a reloaded value stays fresh
+        """
+        self.deadline = deadline
+        self.loader = loader
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self.refreshing = False
+
+
+class Refresher():
+    """
+    Refresher runs loaders on a thread pool for stale cache entries
+
+    Caches are not thread-safe, so workers never touch the cache: a
+    finished reload is queued, and the owner of the cache applies the
+    queue on its next call. Entries deleted, replaced or evicted while
+    their reload ran are not brought back
+    """
+
+    def __init__(self, workers=4):
+        """
+        Initialize the refresher, threads start on the first reload
+
+        Args:
+            workers: Maximum number of concurrent reloads
+        """
+        self.workers = workers
+        self.entries = {}  # key -> _SoftEntry
+        self.completed = deque()  # (key, entry, future) appended by workers
+        self._pool = None
+
+    def track(self, key, deadline, loader, ttl, soft_ttl):
+        """
+        Start tracking a freshly loaded key
+
+        Args:
+            key: Key that was loaded
+            deadline: Time after which the value is stale
+            loader: callable(key) returning a fresh value
+            ttl: Hard TTL given to reloaded values
+            soft_ttl: Seconds a reloaded value stays fresh
+        """
+        self.entries[key] = _SoftEntry(deadline, loader, ttl, soft_ttl)
+
+    def forget(self, key):
+        """
+        Stop tracking a key, any reload in progress will be ignored
+
+        Args:
+            key: Key that left the cache or was replaced
+        """
+        self.entries.pop(key, None)
+
+    def refresh_if_stale(self, key, now):
+        """
+        Start a background reload of a stale key, once
+
+        Args:
+            key: Key that was just read
+            now: Current time on the cache clock
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.refreshing or entry.deadline > now:
+            return
+        entry.refreshing = True
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers,
+                                            "cache-refresh")
+        future = self._pool.submit(entry.loader, key)
+        future.add_done_callback(
+            lambda done: self.completed.append((key, entry, done)))
+
+    def drain(self):
+        """
+        Collect the reloads that finished and are still relevant
+
+        Failed reloads are dropped, the stale value being served until
+        the next reload attempt
+
+        Returns:
+            List of (key, entry, value) for the owner to store
+        """
+        fresh = []
+        while self.completed:
+            key, entry, future = self.completed.popleft()
+            entry.refreshing = False
+            if self.entries.get(key) is not entry or \
+                    future.exception() is not None:
+                continue
+            fresh.append((key, entry, future.result()))
+        return fresh
+
+    def shutdown(self, wait=True):
+        """
+        Stop the worker threads
+
+        Args:
+            wait: Whether to wait for the reloads in progress
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait)
+            self._pool = None
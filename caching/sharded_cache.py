@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Sharded Cache Module
+Thread-safe cache that spreads keys over independently locked shards
+"""
+
+import threading
+from cache_stats import CacheStats
+from policies import get_policy
+from single_flight import SingleFlight
+
+
+class ShardedCache():
+    """
+    ShardedCache hashes every key onto one of several policy instances
+
+    Each shard is a regular BaseCaching policy guarded by its own lock,
+    so threads working on different shards never wait for each other.
+    Eviction is decided per shard, which approximates the global policy
+    """
+
+    def __init__(self, policy="LRU", shards=16, max_items=None,
+                 max_weight=None, weigher=None):
+        """
+        Initialize the sharded cache
+
+        Args:
+            policy: Policy name (FIFO, LIFO, LRU, MRU, LFU) or cache class
+            shards: Number of independent shards
+            max_items: Total capacity split evenly across the shards,
+                defaults to each policy's own MAX_ITEMS per shard
+            max_weight: Total weight budget split evenly across the shards
+            weigher: callable(key, item) returning the weight of an entry
+        """
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        cache_class = get_policy(policy)
+        per_shard = None
+        if max_items is not None:
+            per_shard = max(1, -(-max_items // shards))
+        weight_per_shard = None
+        if max_weight is not None:
+            weight_per_shard = max_weight / shards
+        self.shards = [cache_class(max_items=per_shard,
+                                   max_weight=weight_per_shard,
+                                   weigher=weigher)
+                       for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self._flights = SingleFlight()
+
+    def _shard_index(self, key):
+        """
+        Pick the shard responsible for a key
+
+        Args:
+            key: Key to place
+
+        Returns:
+            Index of the shard owning the key
+        """
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item, ttl=None, tags=None):
+        """
+        Add an item to the shard that owns the key
+
+        Args:
+            key: Key to identify the item
+            item: Value to be stored in cache
+            ttl: Seconds before the item expires, None to keep it
+            tags: Iterable of tags for invalidate_tag
+        """
+        if key is None or item is None:
+            return
+        index = self._shard_index(key)
+        with self.locks[index]:
+            self.shards[index].put(key, item, ttl, tags)
+
+    def get(self, key):
+        """
+        Retrieve an item from the shard that owns the key
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            The value associated with the key, or None if not found
+        """
+        if key is None:
+            return None
+        index = self._shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def _group(self, keys):
+        """
+        Split keys by the shard owning them
+
+        Args:
+            keys: Iterable of keys, None keys are skipped
+
+        Returns:
+            Dictionary mapping shard index to its list of keys
+        """
+        groups = {}
+        for key in keys:
+            if key is not None:
+                groups.setdefault(self._shard_index(key), []).append(key)
+        return groups
+
+    def put_many(self, items, ttl=None, tags=None):
+        """
+        Add several items, locking each shard involved only once
+
+        Args:
+            items: Mapping or iterable of (key, item) pairs
+            ttl: Seconds before the items expire, None to keep them
+            tags: Iterable of tags given to every item
+        """
+        if not hasattr(items, "items"):
+            items = dict(items)
+        if tags is not None:
+            tags = tuple(tags)
+        for index, keys in self._group(items).items():
+            with self.locks[index]:
+                self.shards[index].put_many(
+                    [(key, items[key]) for key in keys], ttl, tags)
+
+    def get_many(self, keys):
+        """
+        Get several items, locking each shard involved only once
+
+        Args:
+            keys: Iterable of keys
+
+        Returns:
+            Dictionary of the keys that were found and their values
+        """
+        found = {}
+        for index, shard_keys in self._group(keys).items():
+            with self.locks[index]:
+                found.update(self.shards[index].get_many(shard_keys))
+        return found
+
+    def delete_many(self, keys):
+        """
+        Remove several items, locking each shard involved only once
+
+        Args:
+            keys: Iterable of keys
+
+        Returns:
+            The number of keys that were cached and removed
+        """
+        removed = 0
+        for index, shard_keys in self._group(keys).items():
+            with self.locks[index]:
+                removed += self.shards[index].delete_many(shard_keys)
+        return removed
+
+    def delete(self, key):
+        """
+        Remove an item from the shard that owns the key
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        if key is None:
+            return False
+        index = self._shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    def clear(self):
+        """Remove every item from every shard"""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.clear()
+
+    def invalidate_tag(self, tag):
+        """
+        Remove every item carrying a tag from every shard
+
+        Args:
+            tag: Tag given to put
+
+        Returns:
+            The number of items removed
+        """
+        removed = 0
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                removed += shard.invalidate_tag(tag)
+        return removed
+
+    def invalidate_prefix(self, prefix):
+        """
+        Remove every item whose str key starts with a prefix
+
+        Args:
+            prefix: str prefix of the keys to remove
+
+        Returns:
+            The number of items removed
+        """
+        removed = 0
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                removed += shard.invalidate_prefix(prefix)
+        return removed
+
+    def enable_prefix_index(self):
+        """Index the str keys of every shard for invalidate_prefix"""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.enable_prefix_index()
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Get an item, loading and storing it on a miss
+
+        At most one loader runs per key at a time, other threads missing
+        on that key wait for its result. No shard is locked while the
+        loader runs
+
+        Args:
+            key: Key to identify the item
+            loader: callable(key) returning the value, None if there is
+                nothing to cache
+            ttl: Seconds before a loaded item expires, None to keep it
+
+        Returns:
+            The cached or loaded value
+        """
+        item = self.get(key)
+        if item is not None or key is None:
+            return item
+        index = self._shard_index(key)
+        with self.locks[index]:
+            if self.shards[index].is_absent(key):
+                return None
+
+        def load():
+            """Load the item unless a previous flight just stored it"""
+            with self.locks[index]:
+                item = self.shards[index]._get(key)
+            if item is None:
+                item = loader(key)
+                if item is None:
+                    with self.locks[index]:
+                        self.shards[index].mark_absent(key)
+                    return None
+                self.put(key, item, ttl)
+            return item
+
+        return self._flights.do(key, load)
+
+    def add_listener(self, listener):
+        """
+        Register an eviction listener on every shard
+
+        Args:
+            listener: callable taking an EvictionEvent, called while the
+                evicting shard is locked
+        """
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregister an eviction listener from every shard
+
+        Args:
+            listener: callable previously passed to add_listener
+        """
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.remove_listener(listener)
+
+    def enable_negative_cache(self, ttl=5.0, share=0.1, max_items=None):
+        """
+        Start remembering absent keys in every shard
+
+        Args:
+            ttl: Seconds an absence is trusted
+            share: Size of each negative cache relative to its shard
+            max_items: Absent keys remembered in total, overrides share
+        """
+        shard_items = None
+        if max_items is not None:
+            shard_items = max_items / len(self.shards)
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.enable_negative_cache(ttl, share, shard_items)
+
+    def enable_stats(self, sample_every=64):
+        """
+        Start recording statistics on every shard
+
+        Args:
+            sample_every: Time one get or put out of this many
+        """
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.enable_stats(sample_every)
+
+    def stats_snapshot(self):
+        """
+        Get the statistics of all shards combined
+
+        Returns:
+            Dictionary like BaseCaching.stats_snapshot, None if stats are
+            not enabled
+        """
+        total = CacheStats()
+        size = 0
+        weight = 0
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                if shard.stats is None:
+                    return None
+                total.merge(shard.stats)
+                size += len(shard.cache_data)
+                weight += shard.current_weight
+        snapshot = total.snapshot()
+        snapshot["size"] = size
+        snapshot["weight"] = weight
+        return snapshot
+
+    def reset_stats(self):
+        """Set the statistics of every shard back to zero"""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.reset_stats()
+
+    def __len__(self):
+        """Return the number of items across all shards"""
+        return sum(len(shard.cache_data) for shard in self.shards)
+
+    def print_cache(self):
+        """Print the content of every shard as one cache"""
+        items = {}
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                items.update(shard.cache_data)
+        print("Current cache:")
+        for key in sorted(items.keys()):
+            print("{}: {}".format(key, items.get(key)))
+
+
+if __name__ == "__main__":
+    """Test the ShardedCache"""
+    my_cache = ShardedCache("LRU", shards=4, max_items=8)
+
+    def worker(start):
+        """Write and read back a range of keys"""
+        for i in range(start, start + 100):
+            my_cache.put("key{}".format(i), i)
+            my_cache.get("key{}".format(i))
+
+    threads = [threading.Thread(target=worker, args=(n * 100,))
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(len(my_cache))
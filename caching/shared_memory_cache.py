@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Shared Memory Cache Module
+Byte cache shared by the worker processes of one host
+"""
+
+import fcntl
+import hashlib
+import inspect
+import os
+import struct
+import tempfile
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+MAGIC = b"SHMC0002"
+# magic, number of sets, ways per set, slot size; followed by one CLOCK
+# hand byte per set, then the slots
+HEADER = struct.Struct("<8sIII")
+MAX_WAYS = 255  # A hand byte must be able to point at every way
+# key hash, key length, value length, reference bit, used flag
+SLOT_HEADER = struct.Struct("<QHIBB")
+REF_OFFSET = SLOT_HEADER.size - 2
+USED_OFFSET = SLOT_HEADER.size - 1
+THREAD_LOCKS = 64  # In-process lock stripes, record locks are per process
+# Python 3.13 can open a block without registering it for cleanup
+CAN_UNTRACK = "track" in inspect.signature(
+    shared_memory.SharedMemory).parameters
+
+
+def _open_block(name, create, size=0):
+    """
+    Open a shared memory block that the resource tracker leaves alone
+
+    By default a process's resource tracker destroys every block the
+    process touched when it exits, which would pull the cache from under
+    the other workers. The block's lifetime is managed with unlink()
+
+    Args:
+        name: Name of the block
+        create: Whether to create it
+        size: Size in bytes when creating
+
+    Returns:
+        The SharedMemory instance
+    """
+    if CAN_UNTRACK:
+        return shared_memory.SharedMemory(name, create, size, track=False)
+    memory = shared_memory.SharedMemory(name, create, size)
+    resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+def _key_bytes(key):
+    """Encode a str key, bytes keys are used as they are"""
+    return key.encode() if isinstance(key, str) else bytes(key)
+
+
+def _key_hash(key):
+    """Hash a key the same way in every process, unlike hash()"""
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SharedMemoryCache():
+    """
+    SharedMemoryCache stores bytes values in a named shared memory block
+
+    The block is a set-associative table: a key hashes to one set of
+    `ways` fixed-size slots and may live in any of them. A full set
+    evicts with CLOCK, a hit only sets the slot's reference bit, and
+    each set keeps its hand in the block between sweeps. Every
+    set is protected by its own byte-range lock on a lock file, so
+    unrelated processes (e.g. gunicorn workers) can open the cache by
+    name and only contend when they touch the same set. Record locks do
+    not exclude threads of one process, so striped thread locks are
+    taken first
+    """
+
+    def __init__(self, name, sets=1024, ways=8, slot_size=512,
+                 create=False, lock_dir=None):
+        """
+        Open or create the shared cache
+
+        Args:
+            name: Name of the shared memory block, the same in every
+                process
+            sets: Number of sets, used when creating
+            ways: Slots per set, used when creating
+            slot_size: Bytes per slot, key and value included, used when
+                creating
+            create: Create the block instead of attaching to it
+            lock_dir: Directory of the lock file, defaults to the system
+                temporary directory
+        """
+        if create:
+            if slot_size <= SLOT_HEADER.size:
+                raise ValueError("slot_size is too small")
+            if not 1 <= ways <= MAX_WAYS:
+                raise ValueError("ways must be between 1 and {}".format(
+                    MAX_WAYS))
+            size = HEADER.size + sets + sets * ways * slot_size
+            self.memory = _open_block(name, True, size)
+            HEADER.pack_into(self.memory.buf, 0, MAGIC, sets, ways,
+                             slot_size)
+        else:
+            self.memory = _open_block(name, False)
+            magic, sets, ways, slot_size = HEADER.unpack_from(
+                self.memory.buf, 0)
+            if magic != MAGIC:
+                raise ValueError("{} is not a shared cache".format(name))
+        self.name = name
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.max_payload = slot_size - SLOT_HEADER.size
+        self._slots = HEADER.size + sets  # Offset of the first slot
+        lock_path = os.path.join(lock_dir or tempfile.gettempdir(),
+                                 "{}.lock".format(name))
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCKS)]
+
+    def _lock(self, index):
+        """Lock one set against other threads and processes"""
+        self._thread_locks[index % THREAD_LOCKS].acquire()
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, index)
+
+    def _unlock(self, index):
+        """Release the lock of one set"""
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, index)
+        self._thread_locks[index % THREAD_LOCKS].release()
+
+    def _slot_offset(self, index, way):
+        """Return the offset of a slot in the shared block"""
+        return self._slots + (index * self.ways + way) * self.slot_size
+
+    def _find(self, index, key_hash, key):
+        """
+        Look a key up in its set, the set must be locked
+
+        Returns:
+            Tuple (offset, value length) of the slot, or None
+        """
+        buf = self.memory.buf
+        for way in range(self.ways):
+            offset = self._slot_offset(index, way)
+            slot_hash, key_len, value_len, _, used = \
+                SLOT_HEADER.unpack_from(buf, offset)
+            if not used or slot_hash != key_hash or key_len != len(key):
+                continue
+            start = offset + SLOT_HEADER.size
+            if buf[start:start + key_len] == key:
+                return offset, value_len
+        return None
+
+    def _locate(self, key):
+        """Return the encoded key, its hash and the index of its set"""
+        key = _key_bytes(key)
+        key_hash = _key_hash(key)
+        return key, key_hash, key_hash % self.sets
+
+    def get(self, key):
+        """
+        Retrieve a value
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            A copy of the value as bytes, or None if not found
+        """
+        view = self.get_view(key)
+        if view is None:
+            return None
+        try:
+            return bytes(view)
+        finally:
+            view.release()
+
+    def get_view(self, key):
+        """
+        Retrieve a value without copying it
+
+        The view points into shared memory: release it quickly, and note
+        that another process may overwrite the slot while it is held
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            A read-only memoryview of the value, or None if not found
+        """
+        if key is None:
+            return None
+        key, key_hash, index = self._locate(key)
+        self._lock(index)
+        try:
+            found = self._find(index, key_hash, key)
+            if found is None:
+                return None
+            offset, value_len = found
+            self.memory.buf[offset + REF_OFFSET] = 1
+            start = offset + SLOT_HEADER.size + len(key)
+            return self.memory.buf[start:start + value_len].toreadonly()
+        finally:
+            self._unlock(index)
+
+    def put(self, key, item):
+        """
+        Store a value, evicting from the key's set with CLOCK if needed
+
+        Args:
+            key: str or bytes key
+            item: bytes-like value; key and value must fit in one slot
+
+        Returns:
+            True if stored, False if the entry is too large
+        """
+        if key is None or item is None:
+            return False
+        key, key_hash, index = self._locate(key)
+        item = memoryview(item).cast("B")
+        if len(key) + len(item) > self.max_payload:
+            return False
+        buf = self.memory.buf
+        self._lock(index)
+        try:
+            found = self._find(index, key_hash, key)
+            if found is not None:
+                offset = found[0]
+            else:
+                offset = self._free_or_victim(index)
+            SLOT_HEADER.pack_into(buf, offset, key_hash, len(key),
+                                  len(item), 0, 1)
+            start = offset + SLOT_HEADER.size
+            buf[start:start + len(key)] = key
+            start += len(key)
+            buf[start:start + len(item)] = item
+            return True
+        finally:
+            self._unlock(index)
+
+    def _free_or_victim(self, index):
+        """
+        Pick the slot for a new key in a locked set
+
+        Returns:
+            Offset of an unused slot, or of the CLOCK victim
+        """
+        buf = self.memory.buf
+        for way in range(self.ways):
+            offset = self._slot_offset(index, way)
+            if not buf[offset + USED_OFFSET]:
+                return offset
+        # Second chance from where the last sweep of this set stopped:
+        # clear reference bits until one is found clear
+        hand_offset = HEADER.size + index
+        way = buf[hand_offset]
+        while True:
+            offset = self._slot_offset(index, way)
+            way = (way + 1) % self.ways
+            if not buf[offset + REF_OFFSET]:
+                buf[hand_offset] = way
+                return offset
+            buf[offset + REF_OFFSET] = 0
+
+    def delete(self, key):
+        """
+        Remove a key
+
+        Args:
+            key: str or bytes key
+
+        Returns:
+            True if the key was cached, False otherwise
+        """
+        if key is None:
+            return False
+        key, key_hash, index = self._locate(key)
+        self._lock(index)
+        try:
+            found = self._find(index, key_hash, key)
+            if found is None:
+                return False
+            self.memory.buf[found[0] + USED_OFFSET] = 0
+            return True
+        finally:
+            self._unlock(index)
+
+    def close(self):
+        """Detach from the shared block, which stays available"""
+        self.memory.close()
+        os.close(self._lock_fd)
+
+    def unlink(self):
+        """Destroy the shared block, once every process is done with it"""
+        if not CAN_UNTRACK:
+            # unlink() unregisters the block, balance it on Python < 3.13
+            resource_tracker.register(self.memory._name, "shared_memory")
+        self.memory.unlink()
+
+
+if __name__ == "__main__":
+    """Test the SharedMemoryCache across two processes"""
+    from multiprocessing import Process
+
+    def worker(name):
+        """Attach by name and read what the parent wrote"""
+        cache = SharedMemoryCache(name)
+        print(cache.get("user:1"))
+        cache.put("user:2", b"written by the child")
+        cache.close()
+
+    my_cache = SharedMemoryCache("shm_cache_demo", sets=8, ways=4,
+                                 create=True)
+    try:
+        my_cache.put("user:1", b"written by the parent")
+        child = Process(target=worker, args=("shm_cache_demo",))
+        child.start()
+        child.join()
+        print(my_cache.get("user:2"))
+    finally:
+        my_cache.close()
+        my_cache.unlink()
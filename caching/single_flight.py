@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Single Flight Module
+Coalesces concurrent calls for the same key into one execution
+"""
+
+import threading
+
+
+class _Call():
+    """
+    A call in progress and the outcome its waiters will receive
+    """
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        """Initialize a pending call"""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight():
+    """
+    SingleFlight runs at most one function per key at a time
+
+    The first caller for a key runs the function; callers arriving while
+    it runs wait for it and receive the same result, or the same
+    exception
+    """
+
+    def __init__(self):
+        """Initialize with no call in progress"""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function):
+        """
+        Run function for key unless a call for key is already running
+
+        Args:
+            key: Key identifying the work
+            function: callable without arguments doing the work
+
+        Returns:
+            The value returned by the call that ran
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
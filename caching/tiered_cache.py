@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tiered Cache Module
+In-memory policy (L1) spilling its evictions to a SQLite store (L2)
+"""
+
+import pickle
+import sqlite3
+import time
+from base_caching import EVICTED_CAPACITY, EVICTED_WEIGHT
+from policies import get_policy
+
+PROTOCOL = 4  # Fixed so a key always pickles to the same bytes
+
+
+class DiskStore():
+    """
+    DiskStore keeps pickled entries in a SQLite table, evicting by LRU
+
+    Durability is not needed for a cache, so the journal runs in WAL
+    mode with synchronous writes turned off. The pickled keys are also
+    kept in memory, so lookups and deletes of keys that are not on disk
+    never reach SQLite
+    """
+
+    def __init__(self, path, max_items=10000):
+        """
+        Open or create the store
+
+        Args:
+            path: SQLite database file
+            max_items: Maximum number of entries kept on disk
+        """
+        self.max_items = max_items
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                        "key BLOB PRIMARY KEY, value BLOB NOT NULL, "
+                        "expires_at REAL, used INTEGER NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_used "
+                        "ON entries (used)")
+        self._keys = {row[0] for row in self.db.execute(
+            "SELECT key FROM entries")}
+        last_used = self.db.execute("SELECT MAX(used) FROM entries")
+        self._clock = last_used.fetchone()[0] or 0  # Recency counter
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def put(self, key, item, expires_at=None):
+        """
+        Store an entry, evicting the least recently used ones if needed
+
+        Args:
+            key: Key of the entry
+            item: Value of the entry
+            expires_at: Wall clock time the entry expires at, or None
+        """
+        self._clock += 1
+        packed = pickle.dumps(key, PROTOCOL)
+        self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                        (packed, pickle.dumps(item, PROTOCOL), expires_at,
+                         self._clock))
+        self._keys.add(packed)
+        self.writes += 1
+        if len(self._keys) > self.max_items:
+            victims = self.db.execute(
+                "SELECT key FROM entries ORDER BY used LIMIT ?",
+                (len(self._keys) - self.max_items,)).fetchall()
+            self.db.executemany("DELETE FROM entries WHERE key = ?",
+                                victims)
+            for victim, in victims:
+                self._keys.discard(victim)
+            self.evictions += len(victims)
+        self.db.commit()
+
+    def pop(self, key):
+        """
+        Remove and return an entry that has not expired
+
+        Args:
+            key: Key of the entry
+
+        Returns:
+            Tuple (item, expires_at), or None if not found or expired
+        """
+        packed = pickle.dumps(key, PROTOCOL)
+        if packed not in self._keys:
+            self.misses += 1
+            return None
+        row = self.db.execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?",
+            (packed,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self._delete(packed)
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(value), expires_at
+
+    def delete(self, key):
+        """
+        Remove an entry
+
+        Args:
+            key: Key of the entry
+
+        Returns:
+            True if the entry existed, False otherwise
+        """
+        return self._delete(pickle.dumps(key, PROTOCOL))
+
+    def _delete(self, packed):
+        """Remove the row of a pickled key if it is on disk"""
+        if packed not in self._keys:
+            return False
+        self._keys.discard(packed)
+        self.db.execute("DELETE FROM entries WHERE key = ?", (packed,))
+        self.db.commit()
+        return True
+
+    def stats_snapshot(self):
+        """Return the counters of the store as a dictionary"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size": len(self._keys),
+        }
+
+    def close(self):
+        """Close the database"""
+        self.db.close()
+
+
+class TieredCache():
+    """
+    TieredCache puts a DiskStore behind an in-memory policy
+
+    Entries the policy evicts for room are written to disk instead of
+    being lost, and a disk hit moves the entry back to memory. An entry
+    lives in exactly one tier at a time
+    """
+
+    def __init__(self, path, policy="LRU", max_items=None,
+                 disk_max_items=10000, **kwargs):
+        """
+        Initialize both tiers
+
+        Args:
+            path: SQLite database file of the disk tier
+            policy: Policy name or cache class of the memory tier
+            max_items: Capacity of the memory tier
+            disk_max_items: Capacity of the disk tier
+            kwargs: Options for the memory policy, such as max_weight
+        """
+        self.memory = get_policy(policy)(max_items=max_items, **kwargs)
+        self.memory.enable_stats()
+        self.memory.add_listener(self._spill)
+        self.disk = DiskStore(path, disk_max_items)
+        self._expires_at = {}  # Wall clock deadlines of memory entries
+        self._incoming = None  # (key, item) being put
+
+    def _spill(self, event):
+        """Write an entry evicted from memory to disk"""
+        incoming = self._incoming
+        if incoming is not None and event.key == incoming[0] and \
+                event.value is not incoming[1]:
+            # The old value of a key being put, dropped because the new
+            # one can never fit: it is stale, not worth keeping
+            return
+        expires_at = self._expires_at.pop(event.key, None)
+        if event.reason in (EVICTED_CAPACITY, EVICTED_WEIGHT):
+            self.disk.put(event.key, event.value, expires_at)
+
+    def put(self, key, item, ttl=None):
+        """
+        Add an item to the memory tier
+
+        Args:
+            key: Key to identify the item
+            item: Value to be stored in cache
+            ttl: Seconds before the item expires, None to keep it
+        """
+        if key is None or item is None:
+            return
+        self.disk.delete(key)
+        if ttl is None:
+            self._expires_at.pop(key, None)
+        else:
+            self._expires_at[key] = time.time() + ttl
+        self._incoming = (key, item)
+        try:
+            self.memory.put(key, item, ttl)
+        finally:
+            self._incoming = None
+        if key not in self.memory.cache_data:
+            self._expires_at.pop(key, None)
+
+    def get(self, key):
+        """
+        Retrieve an item, promoting it to memory if it was on disk
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            The value associated with the key, or None if not found
+        """
+        item = self.memory.get(key)
+        if item is not None or key is None:
+            return item
+        found = self.disk.pop(key)
+        if found is None:
+            return None
+        item, expires_at = found
+        ttl = None
+        if expires_at is not None:
+            ttl = max(expires_at - time.time(), 0)
+            self._expires_at[key] = expires_at
+        self.memory.put(key, item, ttl)
+        return item
+
+    def delete(self, key):
+        """
+        Remove an item from both tiers
+
+        Args:
+            key: Key to identify the item
+
+        Returns:
+            True if the key was cached in either tier, False otherwise
+        """
+        self._expires_at.pop(key, None)
+        in_memory = self.memory.delete(key)
+        return self.disk.delete(key) or in_memory
+
+    def stats_snapshot(self):
+        """Return the statistics of each tier"""
+        return {
+            "memory": self.memory.stats_snapshot(),
+            "disk": self.disk.stats_snapshot(),
+        }
+
+    def close(self):
+        """Close the disk tier"""
+        self.disk.close()
+
+
+if __name__ == "__main__":
+    """Test the TieredCache"""
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "tiered_cache.db")
+    my_cache = TieredCache(path, max_items=2, disk_max_items=2)
+    my_cache.put("A", "Hello")
+    my_cache.put("B", "World")
+    my_cache.put("C", "Holberton")
+    my_cache.put("D", "School")
+    my_cache.put("E", "Battery")
+    my_cache.memory.print_cache()
+    print(my_cache.get("A"))
+    print(my_cache.get("B"))
+    my_cache.memory.print_cache()
+    print(my_cache.stats_snapshot()["disk"])
+    my_cache.close()
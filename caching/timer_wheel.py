@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Timer Wheel Module
+Hierarchical timer wheel used to expire cache entries without scanning
+"""
+
+import heapq
+import itertools
+import math
+
+
+class TimerWheel():
+    """
+    TimerWheel buckets deadlines into levels of increasingly coarse slots
+
+    Level 0 has one slot per tick, level 1 one slot per full turn of
+    level 0, and so on. Advancing the clock only visits the slots that
+    became due, and entries of a coarse slot are cascaded down to finer
+    levels when their turn comes, so expiring a key costs O(1) amortized.
+    The slot of the tick in progress also keeps its entries in a heap by
+    exact deadline, so a key expires as soon as its deadline passes
+    rather than at the end of its tick
+    """
+
+    def __init__(self, resolution=1.0, slots=64, levels=4):
+        """
+        Initialize the timer wheel
+
+        Args:
+            resolution: Length of one tick in seconds
+            slots: Slots per level, must be a power of two
+            levels: Number of levels in the hierarchy
+        """
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.resolution = resolution
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._counts = [0] * levels
+        self._where = {}  # key -> (level, slot, deadline)
+        self._tick = None  # Tick in progress, its slot already cascaded
+        self._due = []  # Heap of (deadline, order, key) due this tick
+        self._order = itertools.count()
+
+    def __len__(self):
+        """Return the number of scheduled keys"""
+        return len(self._where)
+
+    def __contains__(self, key):
+        """Check whether a key is scheduled"""
+        return key in self._where
+
+    def deadline(self, key):
+        """
+        Get the deadline of a scheduled key
+
+        Args:
+            key: Scheduled key
+
+        Returns:
+            The deadline in seconds, or None if the key is not scheduled
+        """
+        where = self._where.get(key)
+        return where[2] if where is not None else None
+
+    def _to_tick(self, when):
+        """Convert a time in seconds to the tick it falls due on"""
+        return math.ceil(when / self.resolution)
+
+    def schedule(self, key, deadline, now):
+        """
+        Schedule a key to expire at a deadline, replacing any previous one
+
+        Args:
+            key: Key to schedule
+            deadline: Expiration time in seconds, same clock as advance
+            now: Current time in seconds; an empty wheel restarts from it
+                since its owner may not have advanced it for a while
+        """
+        self.cancel(key)
+        if not self._where:
+            self._tick = self._to_tick(now)
+            self._due = []
+        self._place(key, deadline)
+
+    def cancel(self, key):
+        """
+        Remove a key from the wheel if it is scheduled
+
+        Args:
+            key: Key to unschedule
+        """
+        where = self._where.pop(key, None)
+        if where is not None:
+            level, slot, _ = where
+            del self._wheels[level][slot][key]
+            self._counts[level] -= 1
+
+    def _place(self, key, deadline):
+        """Put a key in the slot matching its distance from now"""
+        due = max(self._to_tick(deadline), self._tick)
+        delta = due - self._tick
+        if not delta:
+            heapq.heappush(self._due, (deadline, next(self._order), key))
+        level = 0
+        top = self.levels - 1
+        while level < top and delta >> (self._bits * (level + 1)):
+            level += 1
+        slot = (due >> (self._bits * level)) & self._mask
+        self._wheels[level][slot][key] = deadline
+        self._counts[level] += 1
+        self._where[key] = (level, slot, deadline)
+
+    def _cascade(self):
+        """Move entries of coarse slots that start at this tick downwards"""
+        for level in range(self.levels - 1, 0, -1):
+            if self._tick & ((1 << (self._bits * level)) - 1):
+                continue
+            slot = (self._tick >> (self._bits * level)) & self._mask
+            bucket = self._wheels[level][slot]
+            if not bucket:
+                continue
+            self._wheels[level][slot] = {}
+            self._counts[level] -= len(bucket)
+            for key, deadline in bucket.items():
+                self._place(key, deadline)
+
+    def advance(self, now):
+        """
+        Move the wheel forward to a point in time
+
+        Args:
+            now: Current time in seconds
+
+        Returns:
+            List of keys whose deadline has passed, now unscheduled
+        """
+        expired = []
+        target = self._to_tick(now)
+        if self._tick is None:
+            self._tick = target
+            return expired
+        mask = self._mask
+        while self._tick < target:
+            # The tick in progress is over, its whole slot is due
+            bucket = self._wheels[0][self._tick & mask]
+            if bucket:
+                self._wheels[0][self._tick & mask] = {}
+                self._counts[0] -= len(bucket)
+                for key in bucket:
+                    del self._where[key]
+                expired.extend(bucket)
+            if not self._where:
+                self._tick = target
+                self._due = []
+                return expired
+            if self._counts[0]:
+                self._tick += 1
+            else:
+                # Nothing due at level 0, jump to the next cascade point
+                boundary = ((self._tick >> self._bits) + 1) << self._bits
+                self._tick = min(target, boundary)
+            bucket = self._wheels[0][self._tick & mask]
+            self._due = [(deadline, next(self._order), key)
+                         for key, deadline in bucket.items()]
+            heapq.heapify(self._due)
+            self._cascade()
+        # Within the tick in progress, expire by exact deadline
+        due = self._due
+        bucket = self._wheels[0][self._tick & mask]
+        while due and due[0][0] <= now:
+            deadline, _, key = heapq.heappop(due)
+            if bucket.get(key) != deadline:
+                continue  # Cancelled or rescheduled since it was pushed
+            del bucket[key]
+            self._counts[0] -= 1
+            del self._where[key]
+            expired.append(key)
+        return expired
+        while self._tick < target:
+            if not self._where:
+                self._tick = target
+                break
+            if self._counts[0]:
+                self._tick += 1
+            else:
+                # Nothing due at level 0, jump to the next cascade point
+                boundary = ((self._tick >> self._bits) + 1) << self._bits
+                self._tick = min(target, boundary)
+            self._cascade()
+            slot = self._tick & self._mask
+            bucket = self._wheels[0][slot]
+            if bucket:
+                self._wheels[0][slot] = {}
+                self._counts[0] -= len(bucket)
+                for key in bucket:
+                    del self._where[key]
+                expired.extend(bucket)
+        return expired
+
+
+if __name__ == "__main__":
+    """Keys scheduled after a distant one still expire on time"""
+    wheel = TimerWheel()
+    wheel.schedule("a", 3600, now=0)
+    wheel.schedule("b", 1, now=0)
+    print(wheel.advance(5))
+    print(wheel.advance(3600))
+    wheel.schedule("c", 4000.2, now=4000.0)
+    print(wheel.advance(4000.1))
+    print(wheel.advance(4000.3))